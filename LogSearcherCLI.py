@@ -0,0 +1,331 @@
+"""Headless command line interface for the Lobster log tools.
+
+Runs the message log extraction, the RegEx search and the statistics export
+without Qt, e.g. from cron over nightly log drops on Linux batch hosts.
+
+Examples:
+    python LogSearcherCLI.py extract //nesis002/hub/logs/DataWizard results.csv --workers 8
+    python LogSearcherCLI.py extract //nesis002/hub/logs/DataWizard results.csv --incremental
+    python LogSearcherCLI.py extract //nesis002/hub/logs results.csv --since 2024-01-01 --exclude "archive"
+    python LogSearcherCLI.py search app.log -p "Job:\\s+(\\d+)" -H "Job number" --stream
+    python LogSearcherCLI.py search app.log -p "((?:\\w+\\s?)+)$" --compare-engines
+    python LogSearcherCLI.py stats results.csv --excel results_statistics.xlsx
+    python LogSearcherCLI.py stats results_january.csv results_february.csv
+    python LogSearcherCLI.py --profile extract //nesis002/hub/logs/DataWizard results.csv
+
+Exit codes:
+    0    Success
+    1    Error while processing
+    2    Invalid command line arguments
+    3    Input file or folder not found
+    4    No log files or no patterns to process
+    130  Interrupted by the user
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from datetime import datetime, timedelta
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+EXIT_NOTHING_TO_DO = 4
+EXIT_INTERRUPTED = 130
+
+
+def print_message(message:str) -> None:
+    print(message, file=sys.stderr)
+
+
+def print_result(result:dict, as_json:bool) -> None:
+    if as_json:
+        print(json.dumps(result, default=str))
+    else:
+        for key, value in result.items():
+            print(f"{key}: {value}")
+
+
+def parse_date(text:str) -> datetime:
+    """argparse type of the --since and --until dates (YYYY-MM-DD)."""
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {text!r}, expected YYYY-MM-DD")
+
+
+def discovery_filters(args) -> dict:
+    """Returns the discover_log_files filters of the extract command's arguments."""
+    from _internal.modules.log_discovery import DEFAULT_INCLUDE
+
+    return {
+        "include": tuple(args.include) or DEFAULT_INCLUDE,
+        "exclude": tuple(args.exclude),
+        "recursive": not args.no_recursive,
+        "modified_after": args.since.timestamp() if args.since else None,
+        # --until includes the whole day
+        "modified_before": (args.until + timedelta(days=1)).timestamp() if args.until else None,
+    }
+
+
+def write_report(instrumentation, output_path:str, args) -> None:
+    """Writes the run report next to output_path if requested and prints its summary to stderr."""
+    if not (args.report or args.profile):
+        return
+    from _internal.modules.instrumentation import write_run_report
+
+    report, report_path = write_run_report(instrumentation, output_path)
+    for line in instrumentation.summary_lines(report):
+        print_message(line)
+    print_message(f"Run report written to: {report_path}")
+    if report["profile"]:
+        print_message(f"Profile written to: {report['profile']}")
+
+
+# ====== Commands ====== #
+
+def command_extract(args) -> int:
+    from _internal.modules.instrumentation import RunInstrumentation
+    from _internal.modules.log_discovery import discover_log_files
+    from _internal.modules.log_pipeline import LogExtractionJob
+
+    try:
+        files = discover_log_files(args.log_path, **discovery_filters(args))
+    except FileNotFoundError:
+        print_message(f"Log file or folder not found: {args.log_path}")
+        return EXIT_NOT_FOUND
+    if not files:
+        print_message(f"No message log files found in: {args.log_path}")
+        return EXIT_NOTHING_TO_DO
+
+    job = LogExtractionJob(
+        args.log_path,
+        args.output_csv,
+        workers=args.workers,
+        on_output=print_message if args.verbose else None,
+        incremental=args.incremental,
+        parquet_output=args.parquet,
+        summary_output=not args.no_summary,
+        approximate_distinct=args.approximate_distinct,
+        write_buffer_size=args.buffer_size * 1024 * 1024,
+        fsync=args.fsync,
+        checkpoint_rows=args.checkpoint_rows,
+        instrumentation=RunInstrumentation(profile=args.profile),
+    )
+    with job.instrumentation.measure():
+        total_matches = job.run(files)
+    write_report(job.instrumentation, args.output_csv, args)
+    print_result(
+        {"output": args.output_csv, "log_files": len(files), "matches": total_matches},
+        args.json,
+    )
+    return EXIT_OK
+
+
+def command_search(args) -> int:
+    from _internal.modules.compressed_input import is_compressed
+    from _internal.modules.instrumentation import RunInstrumentation
+    from _internal.modules.pattern_budget import PatternBudgetExceeded, run_search_with_budget
+    from _internal.modules.record_matcher import (
+        RecordMatcher, benchmark_engines, engine_benchmark_lines, write_rows_to_csv,
+    )
+    from _internal.modules.redos_check import find_super_linear
+
+    if not os.path.isfile(args.log_file):
+        print_message(f"Log file not found: {args.log_file}")
+        return EXIT_NOT_FOUND
+    if not args.patterns:
+        print_message("No RegEx patterns given, use -p/--pattern.")
+        return EXIT_NOTHING_TO_DO
+
+    for index, pattern in enumerate(args.patterns, start=1):
+        for finding in find_super_linear(pattern):
+            print_message(f"Warning: pattern {index} {pattern!r}: {finding}")
+
+    delimiter = args.delimiter.encode("latin-1", "backslashreplace").decode("unicode_escape")
+    if args.compare_engines:
+        results = benchmark_engines(args.patterns, args.log_file, delimiter, max_bytes=args.sample_mb * 1024 * 1024)
+        if args.json:
+            print_result({"log_file": args.log_file, "engines": results}, True)
+        else:
+            print("\n".join(engine_benchmark_lines(results)))
+        return EXIT_OK
+
+    headers = args.headers or [f"Pattern {index}" for index in range(1, len(args.patterns) + 1)]
+    if len(headers) != len(args.patterns):
+        print_message("Error: Number of headers must match number of RegEx patterns")
+        return EXIT_USAGE
+
+    output_csv = args.output
+    if not output_csv:
+        os.makedirs("CSVResults", exist_ok=True)
+        output_csv = os.path.join("CSVResults", f"regex_matches_{datetime.now().strftime('%d.%m.%y-%H%M%S')}.csv")
+
+    matcher = RecordMatcher(args.patterns, delimiter, engine=args.engine)
+    if args.verbose:
+        print_message(f"RegEx engine per pattern: {', '.join(matcher.engines)}")
+    instrumentation = RunInstrumentation(profile=args.profile)
+    if args.block_budget:
+        try:
+            with instrumentation.measure(), instrumentation.stage("search"):
+                total_rows = run_search_with_budget(
+                    args.patterns, args.log_file, headers, output_csv, delimiter, args.engine, args.block_budget,
+                )
+        except PatternBudgetExceeded as ex:
+            print_message(str(ex))
+            return EXIT_ERROR
+        instrumentation.add_file(args.log_file, os.path.getsize(args.log_file), matches=total_rows)
+        write_report(instrumentation, output_csv, args)
+        print_result({"output": output_csv, "rows": total_rows}, args.json)
+        return EXIT_OK
+
+    with instrumentation.measure():
+        # Compressed files are always streamed
+        if args.stream or is_compressed(args.log_file):
+            rows = matcher.match_file(args.log_file)
+        else:
+            with instrumentation.stage("read"), open(args.log_file, "r") as file:
+                rows = matcher.match_text(file.read())
+        # Records are matched while they are written, the matching time is taken out of the writing time
+        with instrumentation.stage("write"):
+            total_rows = write_rows_to_csv(instrumentation.timed(rows, "match"), headers, output_csv)
+        instrumentation.add_time("write", -instrumentation.stage_seconds("match"), calls=0)
+        instrumentation.add_file(args.log_file, os.path.getsize(args.log_file), matches=total_rows)
+    write_report(instrumentation, output_csv, args)
+    print_result({"output": output_csv, "rows": total_rows}, args.json)
+    return EXIT_OK
+
+
+def command_stats(args) -> int:
+    for csv_path in args.csv_paths:
+        if not os.path.isfile(csv_path):
+            print_message(f"CSV file not found: {csv_path}")
+            return EXIT_NOT_FOUND
+
+    # Imports pandas, only done once the input is known to exist
+    from _internal.modules.run_summary import load_run_summary
+    from _internal.modules.statistics import (
+        export_statistics_to_excel,
+        filetype_statistics,
+        load_results,
+        profile_size_statistics,
+        statistics_from_run_summary,
+        summary_dataframe,
+        summary_statistics,
+    )
+
+    run_summaries = [load_run_summary(csv_path) for csv_path in args.csv_paths]
+    if all(run_summaries):
+        # Written during extraction, the CSV files do not have to be read
+        run_summary = run_summaries[0]
+        for other in run_summaries[1:]:
+            run_summary.merge(other)
+        statistics = statistics_from_run_summary(run_summary)
+    else:
+        if len(args.csv_paths) > 1:
+            import pandas as pd
+            df = pd.concat([load_results(csv_path) for csv_path in args.csv_paths], ignore_index=True)
+            df["Profile Name"] = df["Profile Name"].astype("category")
+            df["Job Number"] = df["Job Number"].astype("category")
+        else:
+            df = load_results(args.csv_paths[0])
+        statistics = {
+            "summary": summary_statistics(df),
+            "profile_size": profile_size_statistics(df),
+            "filetype": filetype_statistics(df),
+        }
+    summary = statistics["summary"]
+    result = {
+        key: value for key, value in summary.items()
+        if key not in ("files_by_profile", "top_10_largest", "top_10_smallest")
+    }
+
+    if args.excel:
+        export_statistics_to_excel(
+            {
+                "Summary": summary_dataframe(summary),
+                "Per Profile Statistics": statistics["profile_size"],
+                "Top Filetypes": statistics["filetype"],
+            },
+            args.excel,
+        )
+        result["excel"] = args.excel
+
+    print_result(result, args.json)
+    return EXIT_OK
+
+
+# ====== Argument parsing ====== #
+
+def build_parser() -> argparse.ArgumentParser:
+    # Only the engine names, the engines themselves are imported when a search runs
+    from _internal.modules.regex_engines import AUTO_ENGINE, ENGINE_CHOICES
+
+    parser = argparse.ArgumentParser(
+        prog="LogSearcherCLI",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--json", action="store_true", help="Print the result as a single JSON line")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print progress messages to stderr")
+    parser.add_argument("--report", action="store_true", help="Write a run report with stage timings next to the output file and print it to stderr")
+    parser.add_argument("--profile", action="store_true", help="Also write a cProfile dump next to the output file (implies --report)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract_parser = subparsers.add_parser("extract", help="Extract processed files from *_message.log files to CSV")
+    extract_parser.add_argument("log_path", help="Message log file or folder containing *_message.log files (subfolders included, symlinked ones skipped), also compressed (.gz, .bz2, .xz, .zip)")
+    extract_parser.add_argument("output_csv", help="Path of the CSV result file")
+    extract_parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    extract_parser.add_argument("-i", "--incremental", action="store_true", help="Only process log data added since the last run and append it to the CSV file")
+    extract_parser.add_argument("--parquet", action="store_true", help="Also write a typed Parquet dataset next to the CSV file (requires pyarrow)")
+    extract_parser.add_argument("--no-summary", action="store_true", help="Do not write the statistics summary file next to the CSV file")
+    extract_parser.add_argument("--approximate-distinct", action="store_true", help="Estimate the unique filenames and job numbers of the summary with HyperLogLog in fixed memory instead of counting them exactly (about 0.8%% standard error)")
+    extract_parser.add_argument("--buffer-size", type=int, default=4, metavar="MIB", help="CSV write buffer in MiB (default: 4)")
+    extract_parser.add_argument("--fsync", action="store_true", help="Force the CSV file to disk when the run ends (always done with --incremental)")
+    extract_parser.add_argument("--checkpoint-rows", type=int, default=0, metavar="ROWS", help="Also force the CSV file to disk every ROWS rows (default: only at the end)")
+    extract_parser.add_argument("--include", action="append", default=[], metavar="GLOB", help="File names to process, can be repeated (default: *_message.log and its compressed forms)")
+    extract_parser.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="File or folder names, or paths below log_path, to skip, can be repeated")
+    extract_parser.add_argument("--since", type=parse_date, metavar="YYYY-MM-DD", help="Only process log files modified on or after this day")
+    extract_parser.add_argument("--until", type=parse_date, metavar="YYYY-MM-DD", help="Only process log files modified on or before this day")
+    extract_parser.add_argument("--no-recursive", action="store_true", help="Do not search the subfolders of log_path")
+    extract_parser.set_defaults(func=command_extract)
+
+    search_parser = subparsers.add_parser("search", help="Search a log file with RegEx patterns and save the matches to CSV")
+    search_parser.add_argument("log_file", help="Log file to search, .gz, .bz2, .xz and .zip files are decompressed as a stream")
+    search_parser.add_argument("-p", "--pattern", dest="patterns", action="append", default=[], help="RegEx pattern, can be repeated")
+    search_parser.add_argument("-H", "--header", dest="headers", action="append", default=[], help="CSV header per pattern, can be repeated")
+    search_parser.add_argument("-d", "--delimiter", default="\\n", help="Record delimiter, escapes like \\n\\n allowed (default: one record per line)")
+    search_parser.add_argument("-o", "--output", help="Path of the CSV result file (default: CSVResults/regex_matches_<date>.csv)")
+    search_parser.add_argument("--stream", action="store_true", help="Scan the file memory-mapped instead of reading it at once")
+    search_parser.add_argument("--engine", choices=ENGINE_CHOICES, default=AUTO_ENGINE, help="RegEx engine, re2 and regex must be installed (default: auto, re unless a pattern needs another)")
+    search_parser.add_argument("--compare-engines", action="store_true", help="Time the search with every installed RegEx engine instead of writing a CSV file")
+    search_parser.add_argument("--block-budget", type=float, default=0, metavar="SECONDS", help="Search in a separate process that is stopped once all patterns together take longer than SECONDS on a block of records (up to 16 MB), the partial CSV file is removed then. The file is always streamed (default: 0, off)")
+    search_parser.add_argument("--sample-mb", type=int, default=64, metavar="MB", help="MB at the start of the log file the engines are compared on (default: 64)")
+    search_parser.set_defaults(func=command_search)
+
+    stats_parser = subparsers.add_parser("stats", help="Calculate file size statistics of one or more CSV result files")
+    stats_parser.add_argument("csv_paths", nargs="+", metavar="csv_path", help="CSV result files of the extract command, their statistics are combined")
+    stats_parser.add_argument("--excel", help="Export the statistics to this Excel file")
+    stats_parser.set_defaults(func=command_stats)
+
+    return parser
+
+
+def main(argv:list=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print_message("Interrupted by user.")
+        return EXIT_INTERRUPTED
+    except Exception as ex:
+        print_message(f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}")
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,10 +1,8 @@
-import csv
+import multiprocessing
 import os
-import re
 import sys
-import pandas as pd
 import datetime
-from PySide6.QtCore import QSettings, QThread, Signal
+from PySide6.QtCore import QDate, QSettings, QThread, Signal
 from PySide6.QtGui import QAction, QCloseEvent, QIcon
 from PySide6.QtWidgets import (
     QApplication,
@@ -23,7 +21,27 @@ from PySide6.QtWidgets import (
     QWidget,
     QTabWidget,
     QMessageBox,
+    QSpinBox,
+    QCheckBox,
+    QDateEdit,
 )
+from _internal.modules.excel_export import EXCEL_MAX_ROWS, stream_csv_to_excel
+from _internal.modules.instrumentation import RunInstrumentation, write_run_report
+from _internal.modules.log_discovery import DEFAULT_INCLUDE, discover_log_files, parse_globs
+from _internal.modules.log_pipeline import LogExtractionJob
+from _internal.modules.parallel_scan import default_worker_count
+from _internal.modules.progress import format_bytes, format_progress
+from _internal.modules.statistics import (
+    export_statistics_to_excel,
+    filesize_totals,
+    filetype_statistics,
+    load_results,
+    profile_size_statistics,
+    statistics_from_run_summary,
+    summary_dataframe,
+    summary_statistics,
+)
+from _internal.modules.run_summary import load_run_summary
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -267,19 +285,23 @@ class GenericWorker(QThread):
     status = Signal(str)
     finished = Signal(str)
     progress_value = Signal(int)
+    progress_info = Signal(object)
     cancel_requested = Signal()
     messagebox_warn = Signal(str, str)
     messagebox_info = Signal(str, str)
     messagebox_crit = Signal(str, str)
     output_window_clear = Signal()
+    statistic_ready = Signal(str, object)
 
-    def __init__(self, task:str, *args, **kwargs):
+    def __init__(self, task:str, *args, profile:bool=False, **kwargs):
         super().__init__()
         self.task = task  # A string to identify the task: "export_excel" or "search_logs"
         self.args = args  # Arguments for the task
         self.kwargs = kwargs # Keyword arguments for the task
         self._is_cancelled = False
         self.cancel_requested.connect(self.cancel)
+        # Stage timings of the task, profiled with cProfile if profile is set
+        self.instrumentation = RunInstrumentation(profile=profile)
 
 
     def cancel(self):
@@ -287,16 +309,34 @@ class GenericWorker(QThread):
 
 
     def run(self):
-        if self.task == "export_excel":
-            self.export_csv_to_excel(*self.args, **self.kwargs)
-        elif self.task == "write_log_data_to_csv":
-            self.extract_and_write_to_csv(*self.args, **self.kwargs)
-        # Add more tasks as needed
-        else:
-            raise ValueError(f"Unknown task: {self.task}")
+        with self.instrumentation.measure():
+            if self.task == "export_excel":
+                self.export_csv_to_excel(*self.args, **self.kwargs)
+            elif self.task == "write_log_data_to_csv":
+                self.extract_and_write_to_csv(*self.args, **self.kwargs)
+            elif self.task == "compute_statistics":
+                self.compute_statistics(*self.args, **self.kwargs)
+            elif self.task == "summarize_filesize":
+                self.summarize_filesize(*self.args, **self.kwargs)
+            # Add more tasks as needed
+            else:
+                raise ValueError(f"Unknown task: {self.task}")
 
 
-    def export_csv_to_excel(self, csv_file_path:str, excel_file_path:str) -> None:
+    def report_run(self, output_path:str) -> None:
+        """Shows where the time of the task went and writes the run report next to output_path."""
+        try:
+            report, report_path = write_run_report(self.instrumentation, output_path)
+        except OSError as ex:
+            self.output_window.emit(f"Could not write the run report: {ex}")
+            return
+        self.output_window.emit("\n".join(self.instrumentation.summary_lines(report)))
+        self.output_window.emit(f"Run report written to: {report_path}")
+        if report["profile"]:
+            self.output_window.emit(f"Profile written to: {report['profile']} (open with pstats or snakeviz)")
+
+
+    def export_csv_to_excel(self, csv_file_path:str, excel_file_path:str, split_workbooks:bool=False) -> None:
             if not csv_file_path:
                 self.messagebox_warn.emit(
                     "No CSV File", "Please select a CSV file to convert."
@@ -306,32 +346,35 @@ class GenericWorker(QThread):
                 self.output_window.emit("Exporting CSV to Excel... please wait.")
     
             try:
-                with open(csv_file_path, encoding="utf-8") as file:
-                    sample = file.read(2048)
-                    sniffer = csv.Sniffer()
-                    get_delimiter = sniffer.sniff(sample).delimiter
-                    
-                csv_df = pd.read_csv(
-                    csv_file_path,
-                    delimiter=get_delimiter,
-                    encoding="utf-8",
-                    engine="pyarrow",
-                    index_col=0,
-                )
-                csv_row_count = csv_df.shape[0]
-                
-                if csv_row_count < 1048576:
-                    # Export to Excel
-                    with pd.ExcelWriter(excel_file_path, engine="xlsxwriter") as writer:
-                        csv_df.to_excel(writer, sheet_name="Statistics Data", index=False)
-    
+                # Rows are streamed into the workbook, files over the Excel row limit continue on further sheets
+                with self.instrumentation.stage("export"):
+                    total_rows, sheet_count, workbook_paths = stream_csv_to_excel(
+                        csv_file_path,
+                        excel_file_path,
+                        split_workbooks=split_workbooks,
+                        is_cancelled=lambda: self._is_cancelled,
+                        on_progress=self.progress_value.emit,
+                    )
+                self.output_window_clear.emit()
+
+                if self._is_cancelled:
+                    self.output_window.emit(f"Excel export cancelled by user after {total_rows} rows.")
+                    return
+                self.progress_value.emit(100)
+                self.instrumentation.add_file(csv_file_path, os.path.getsize(csv_file_path), lines=total_rows)
+                self.report_run(excel_file_path)
+                if sheet_count > 1:
                     self.messagebox_info.emit(
                         "Successful conversion",
-                        f"Successfully converted:\n{csv_file_path}\nto\n{excel_file_path}",
+                        f"Successfully converted {total_rows} rows of:\n{csv_file_path}\nto\n" + "\n".join(workbook_paths)
+                        + f"\n\nThe rows exceed the Excel limit of {EXCEL_MAX_ROWS} rows per sheet and were split across {sheet_count} "
+                        + ("workbooks." if split_workbooks else "sheets."),
                     )
                 else:
-                    self.messagebox_warn.emit("Too many rows", f"The CSV file exceeds the maximum row limit 1048576 for Excel. Your file contains {csv_row_count} rows.\nFile conversion not possible.")
-                self.output_window_clear.emit()
+                    self.messagebox_info.emit(
+                        "Successful conversion",
+                        f"Successfully converted:\n{csv_file_path}\nto\n{excel_file_path}",
+                    )
     
             except Exception as ex:
                 message = f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}"
@@ -340,130 +383,96 @@ class GenericWorker(QThread):
                 )
 
 
-    def process_file(self, filepath:str, file_index:int, total_files:int) -> None:
-        if self._is_cancelled:
+    def extract_and_write_to_csv(self, filepath:str, output_file_csv:str, workers:int=1,
+                                 incremental:bool=False, parquet_output:bool=False,
+                                 approximate_distinct:bool=False, discovery_filters:dict=None) -> None:
+        try:
+            # Usually the cached listing of the folder selection, refreshed if the folder changed
+            files = discover_log_files(filepath, **(discovery_filters or {}))
+        except FileNotFoundError as e:
+            self.output_window.emit(str(e))
             return
 
-        total_lines = self.count_lines(filepath)
-        if total_lines == 0:
-            self.output_window.emit(f"Skipping empty file: {filepath}")
+        if self._is_cancelled:
+            self.output_window.emit("Operation cancelled by user.")
             return
 
-        filename = os.path.basename(filepath)
-        self.output_window.emit(
-            f"Processing {filename}... (Filesize: {os.path.getsize(filepath)} bytes, {total_lines} lines)"
+        job = LogExtractionJob(
+            filepath,
+            output_file_csv,
+            workers=workers,
+            on_output=self.output_window.emit,
+            on_progress_info=self.progress_info.emit,
+            is_cancelled=lambda: self._is_cancelled,
+            incremental=incremental,
+            parquet_output=parquet_output,
+            approximate_distinct=approximate_distinct,
+            instrumentation=self.instrumentation,
         )
-        self.progress_value.emit(
-            int((file_index / total_files) * 100)
-        )  # High-level file progress
-
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as log_file:
-            for idx, line in enumerate(log_file, start=1):
-                if self._is_cancelled:
-                    break
-
-                extracted_info = self.extract_info_from_line(line)
-                if extracted_info:
-                    yield extracted_info
-
-                if (
-                    idx % 100 == 0 or idx == total_lines
-                ):  # Update progress every 100 lines or at the end
-                    percent = int((idx / total_lines) * 100)
-                    self.status.emit(
-                        f"Processing file {file_index}/{total_files} - Current file progress: {percent}% completed"
-                    )
-
-        self.output_window.emit(">>> Finished processing log file.")
-
-
-    def extract_and_write_to_csv(self, filepath:str, output_file_csv:str) -> None:
-        if os.path.isfile(filepath):
-            files = [filepath]
-        elif os.path.isdir(filepath):
-            files = [
-                os.path.join(filepath, f)
-                for f in os.listdir(filepath)
-                if f.endswith("_message.log")
-            ]
-        else:
-            self.output_window.emit("Invalid filepath.")
+        try:
+            total_matches = job.run(files)
+            self.report_run(output_file_csv)
+            self.finished.emit(
+                f"\nData written to: {output_file_csv}\n"
+                f"Total Log Files: {len(files)}\n"
+                f"Total Matches: {total_matches}"
+            )
+        except Exception as e:
+            self.output_window.emit(f"Error writing to CSV: {e}")
+
+
+    def compute_statistics(self, csv_path:str) -> None:
+        # Every aggregate is emitted as soon as it is done, failures are emitted as the exception
+        statistics = [
+            ("summary", summary_statistics),
+            ("profile_size", profile_size_statistics),
+            ("filetype", filetype_statistics),
+        ]
+        run_summary = load_run_summary(csv_path)
+        if run_summary is not None:
+            # Figures accumulated while the CSV was written, nothing has to be read again
+            self.status.emit("Reading summary written during extraction...")
+            for name, result in statistics_from_run_summary(run_summary).items():
+                self.statistic_ready.emit(name, result)
+            self.progress_value.emit(100)
+            self.finished.emit("Statistics complete (from extraction summary).")
             return
 
-        total_matches = 0
+        self.status.emit("Loading results...")
+        self.progress_value.emit(0)
+        try:
+            df = load_results(csv_path)
+            load_error = None
+        except Exception as e:
+            df = None
+            load_error = e
+        self.progress_value.emit(40)
 
-        if not self._is_cancelled:
+        for index, (name, calculate) in enumerate(statistics, 1):
+            if self._is_cancelled:
+                self.finished.emit("Calculation cancelled by user.")
+                return
+            self.status.emit(f"Calculating {name.replace('_', ' ')} statistics...")
             try:
-                with open(
-                    output_file_csv, "w", newline="", encoding="utf-8"
-                ) as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(
-                        [
-                            "Time",
-                            "Job Number",
-                            "Profile Name",
-                            "Filename",
-                            "Filesize in Bytes",
-                        ]
-                    )
-
-                    for idx, file in enumerate(files, start=1):
-                        if self._is_cancelled:
-                            break
-
-                        for row in self.process_file(file, idx, len(files)):
-                            writer.writerow(row)
-                            total_matches += 1
-
-                self.finished.emit(
-                    f"\nData written to: {output_file_csv}\n"
-                    f"Total Log Files: {len(files)}\n"
-                    f"Total Matches: {total_matches}"
-                )
+                result = load_error if df is None else calculate(df)
             except Exception as e:
-                self.output_window.emit(f"Error writing to CSV: {e}")
-        else:
-            self.output_window.emit("Operation cancelled by user.")
+                result = e
+            self.statistic_ready.emit(name, result)
+            self.progress_value.emit(40 + 60 * index // len(statistics))
+        self.finished.emit("Statistics complete.")
 
 
-    # Helper methods
-    def count_lines(self, filepath:str) -> int:
-        count = 0
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as file:
-            for _ in file:
-                count += 1
-        return count
-
-
-    def extract_info_from_line(self, line:str) -> list:
-        time_pattern = r"\b(\d{2}:\d{2}:\d{2})\b"
-        job_number_pattern = r"Job:\s+((?:\d+|GENERAL))"
-        profilename_pattern = r"\[(.*?)]"
-        filename_pattern = r"Start processing data of file '(.*?)'"
-        filesize_pattern = r"length=(\d+),"
-
-        time_match = re.search(time_pattern, line)
-        job_number_match = re.search(job_number_pattern, line)
-        profilename_match = re.search(profilename_pattern, line)
-        filename_match = re.search(filename_pattern, line)
-        filesize_match = re.search(filesize_pattern, line)
-
-        if (
-            time_match
-            and job_number_match
-            and profilename_match
-            and filename_match
-            and filesize_match
-        ):
-            return [
-                time_match.group(1),
-                job_number_match.group(1),
-                profilename_match.group(1),
-                filename_match.group(1),
-                filesize_match.group(1),
-            ]
-        return None
+    def summarize_filesize(self, csv_path:str) -> None:
+        try:
+            totals = filesize_totals(
+                csv_path,
+                is_cancelled=lambda: self._is_cancelled,
+                on_progress=self.progress_value.emit,
+            )
+        except Exception as e:
+            totals = e
+        self.progress_value.emit(100)
+        self.statistic_ready.emit("filesize_totals", totals)
 
 
 class StatisticsWindow(QMainWindow):
@@ -478,55 +487,113 @@ class StatisticsWindow(QMainWindow):
         self.setStyleSheet(STYLESHEET_THEME)
         self.statistics_dataframes = {}  # To store dataframes for export
 
+        container = QWidget()
+        layout = QVBoxLayout(container)
         self.central_widget = QTabWidget()
-        self.setCentralWidget(self.central_widget)
+        layout.addWidget(self.central_widget)
 
-        self.create_summary_tab()
-        # self.create_profile_size_analysis_tab() # 07.05.2025 commented out
-        # self.create_filetype_analysis_tab() # 07.05.2025 commented out
+        progress_layout = QHBoxLayout()
+        self.status_label = QLabel("Loading results...")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximum(100)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setToolTip("Stop calculating the remaining statistics")
+        progress_layout.addWidget(self.status_label)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+        self.setCentralWidget(container)
+
+        # Statistics are calculated in a worker thread, tabs are added as results arrive
+        self.worker = GenericWorker("compute_statistics", csv_path)
+        self.worker.statistic_ready.connect(self.add_statistic_tab)
+        self.worker.status.connect(self.status_label.setText)
+        self.worker.progress_value.connect(self.progress_bar.setValue)
+        self.worker.finished.connect(self.statistics_finished)
+        self.cancel_button.clicked.connect(self.worker.cancel_requested.emit)
+        self.worker.start()
 
         self.show()
 
 
+    def add_statistic_tab(self, name:str, result) -> None:
+        if name == "summary":
+            self.create_summary_tab(result)
+        elif name == "profile_size":
+            self.create_profile_size_analysis_tab(result)
+        elif name == "filetype":
+            self.create_filetype_analysis_tab(result)
+
+
+    def statistics_finished(self, message:str) -> None:
+        self.status_label.setText(message)
+        self.cancel_button.setEnabled(False)
+
+
     def closeEvent(self, event):
+        if self.worker.isRunning():
+            # Drop the remaining results and clean up once the current aggregate is done
+            self.worker.statistic_ready.disconnect(self.add_statistic_tab)
+            self.worker.finished.connect(self.deleteLater)
+            self.worker.cancel_requested.emit()
+            event.accept()
+            return
         self.central_widget.deleteLater()  # Clean up the tab widget
         self.deleteLater()  # Clean up the stats window
         event.accept()  # Accept the close event
 
 
-    def create_summary_tab(self):
+    def create_summary_tab(self, summary):
         summary_tab = QWidget()
         summary_layout = QVBoxLayout(summary_tab)
         summary_text = QTextEdit()
         summary_text.setReadOnly(True)
 
         try:
-            usecols = ["Filename", "Filesize in Bytes", "Profile Name"]
-            df = pd.read_csv(self.csv_path, usecols=usecols, engine="pyarrow")
-
-            size_stats = df["Filesize in Bytes"].agg(["sum", "mean", "max", "min", "median", "std"])
-            total_files = df["Filename"].nunique()
-            total_entries = len(df)
-            total_size = size_stats["sum"]
-            avg_size = size_stats["mean"]
-            max_size = size_stats["max"]
-            min_size = size_stats["min"]
-            median_size = size_stats["median"]
-            std_dev_size = size_stats["std"]
-            files_by_profile = df["Profile Name"].value_counts()
-            top_10_largest = df.nlargest(10, "Filesize in Bytes")[["Filename", "Filesize in Bytes"]]
-            top_10_smallest = df.nsmallest(10, "Filesize in Bytes")[["Filename", "Filesize in Bytes"]]
+            if isinstance(summary, Exception):
+                raise summary
+
+            total_files = summary["total_files"]
+            unique_jobs = summary["unique_jobs"]
+            unique_profiles = summary["unique_profiles"]
+            distinct_error = summary["distinct_error"]
+            total_entries = summary["total_entries"]
+            total_size = summary["total_size"]
+            avg_size = summary["avg_size"]
+            max_size = summary["max_size"]
+            min_size = summary["min_size"]
+            median_size = summary["median_size"]
+            size_quantiles = summary["size_quantiles"]
+            quantile_error = summary["quantile_error"]
+            std_dev_size = summary["std_dev_size"]
+            files_by_profile = summary["files_by_profile"]
+            top_10_largest = summary["top_10_largest"]
+            top_10_smallest = summary["top_10_smallest"]
 
             summary_text.append("<h2>Summary Statistics</h2>")
-            summary_text.append(f"<ul><li><b>Einzigartige Dateien insgesamt:</b> {total_files}</li>")
+            # Unique counts are HyperLogLog estimates only if the extraction was run with approximate unique counts
+            distinct_estimate = "≈ " if distinct_error else ""
+            distinct_note = f" (estimate, ±{distinct_error:.1%} standard error)" if distinct_error else ""
+            summary_text.append(f"<ul><li><b>Einzigartige Dateien insgesamt:</b> {distinct_estimate}{total_files:,}{distinct_note}</li>")
+            summary_text.append(f"<li><b>Einzigartige Job-Nummern:</b> {distinct_estimate}{unique_jobs:,}{distinct_note}</li>")
+            summary_text.append(f"<li><b>Profile:</b> {unique_profiles:,}</li>")
             summary_text.append(f"<li><b>Gesamte Log-Einträge:</b> {total_entries}</li>")
             summary_text.append(f"<li><b>Gesamtgröße:</b> {int(total_size)} bytes ({total_size / 1024 / 1024:.2f} MB)</li>")
             summary_text.append(f"<li><b>Durchschnittliche Dateigröße:</b> {int(avg_size)} bytes ({avg_size / 1024:.2f} KB)</li>")
             summary_text.append(f"<li><b>Größte Datei:</b> {int(max_size)} bytes ({max_size / 1024 / 1024:.2f} MB)</li>")
             summary_text.append(f"<li><b>Kleinste Datei:</b> {int(min_size)} bytes ({min_size / 1024:.2f} KB)</li></ul><br>")
             summary_text.append("<h2>Additional Statistics</h2>")
-            summary_text.append(f"<ul><li><b>Mittlere Dateigröße:</b> {median_size:,} bytes ({median_size / 1024:.2f} KB)</li>")
+            # Quantiles of a summary written during extraction are sketch estimates
+            estimate = "≈ " if quantile_error else ""
+            estimate_note = f" (estimate, ±{quantile_error:.0%})" if quantile_error else ""
+            summary_text.append(f"<ul><li><b>Mittlere Dateigröße:</b> {estimate}{median_size:,.0f} bytes ({median_size / 1024:.2f} KB){estimate_note}</li>")
             summary_text.append(f"<li><b>Standardabweichung der Dateigrößen:</b> {std_dev_size:,} bytes ({std_dev_size / 1024:.2f} KB)</li></ul><br>")
+            summary_text.append(f"<h2>File Size Percentiles{estimate_note}</h2>")
+            summary_text.append(
+                "<ul>"
+                + "".join(f"<li><b>{label}:</b> {estimate}{value:,.0f} bytes ({value / 1024:.2f} KB)</li>" for label, value in size_quantiles.items())
+                + "</ul><br>"
+            )
             summary_text.append("<h2>Top 10 Largest Files:</h2><br>")
             for _, row in top_10_largest.iterrows():
                 summary_text.append(f"<p>{row['Filename']}: {row['Filesize in Bytes']:,} bytes</p>")
@@ -542,6 +609,9 @@ class StatisticsWindow(QMainWindow):
 
             summary_layout.addWidget(summary_text)
 
+            # Store for export
+            self.statistics_dataframes["Summary"] = summary_dataframe(summary)
+
             export_button = QPushButton("Export to Excel")
             export_button.setObjectName("export_to_excel_summary")
             export_button.setToolTip("Save the statistics as an Excel file")
@@ -556,37 +626,15 @@ class StatisticsWindow(QMainWindow):
             self.central_widget.addTab(summary_tab, "Summary")
 
 
-    def create_profile_size_analysis_tab(self):
+    def create_profile_size_analysis_tab(self, profile_size_summary):
         profile_size_tab = QWidget()
         profile_size_layout = QVBoxLayout(profile_size_tab)
         profile_size_text = QTextEdit()
         profile_size_text.setReadOnly(True)
 
         try:
-            df = pd.read_csv(self.csv_path, usecols=["Filename", "Filesize in Bytes", "Profile Name"], engine="pyarrow")
-
-            profile_size_summary = (
-                df.groupby("Profile Name")
-                .agg(
-                    {
-                        "Filesize in Bytes": ["mean", "std", "min", "max", "count"],
-                        "Filename": lambda x: list(dict.fromkeys(filter(None, x)))[:5],
-                    }
-                )
-                .reset_index()
-            )
-            profile_size_summary.columns = [
-                "Profile Name",
-                "Avg File Size (Bytes)",
-                "Std File Size (Bytes)",
-                "Min File Size (Bytes)",
-                "Max File Size (Bytes)",
-                "Count",
-                "Filenames",
-            ]
-            profile_size_summary["Avg File Size (Bytes)"] = profile_size_summary["Avg File Size (Bytes)"].round(2)
-            profile_size_summary["Std File Size (Bytes)"] = profile_size_summary["Std File Size (Bytes)"].round(2)
-            profile_size_summary["Filenames"] = profile_size_summary["Filenames"].apply(lambda x: ", ".join(x) if x else "None")
+            if isinstance(profile_size_summary, Exception):
+                raise profile_size_summary
 
             profile_size_text.append("<h2>Profile File Size Analysis</h2><br>")
             profile_size_text.append(profile_size_summary.to_html(index=False))
@@ -603,17 +651,15 @@ class StatisticsWindow(QMainWindow):
             self.central_widget.addTab(profile_size_tab, "Profile File Size")
 
 
-    def create_filetype_analysis_tab(self):
+    def create_filetype_analysis_tab(self, filetypes_df):
         filetype_tab = QWidget()
         filetype_layout = QVBoxLayout(filetype_tab)
         filetype_text = QTextEdit()
         filetype_text.setReadOnly(True)
 
         try:
-            df = pd.read_csv(self.csv_path, usecols=["Filename"], engine="pyarrow")
-            df["Filetype"] = df["Filename"].str.extract(r'\.([^.]+)$').fillna("unknown")
-            filetypes_df = df["Filetype"].value_counts().head(20).reset_index()
-            filetypes_df.columns = ["Filetype", "File Count"]
+            if isinstance(filetypes_df, Exception):
+                raise filetypes_df
 
             filetype_text.append("<h2>Top 20 File Types</h2><br>")
             filetype_text.append(filetypes_df.to_html(index=False))
@@ -640,9 +686,7 @@ class StatisticsWindow(QMainWindow):
             if not file_path:
                 return  # User canceled
 
-            with pd.ExcelWriter(file_path, engine="xlsxwriter") as writer:
-                for sheet_name, df_export in self.statistics_dataframes.items():
-                    df_export.to_excel(writer, sheet_name=sheet_name, index=False)
+            export_statistics_to_excel(self.statistics_dataframes, file_path)
 
             QMessageBox.information(
                 self,
@@ -715,10 +759,79 @@ class LogSearcherGUI(QMainWindow):
         self.cancel_button = QPushButton("Cancel")
         self.cancel_button.clicked.connect(self.cancel_processing)
         self.cancel_button.setEnabled(False)
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, default_worker_count())
+        self.workers_spinbox.setValue(
+            min(self.settings.value("worker_processes", 1, type=int), default_worker_count())
+        )
+        self.workers_spinbox.setToolTip(
+            "Number of processes used to search log files in parallel (1 = no process pool)"
+        )
         controls_layout.addWidget(self.start_button)
         controls_layout.addWidget(self.cancel_button)
+        self.incremental_checkbox = QCheckBox("Incremental")
+        self.incremental_checkbox.setChecked(self.settings.value("incremental_scan", False, type=bool))
+        self.incremental_checkbox.setToolTip(
+            "Only process log data added since the last run and append it to the existing CSV file"
+        )
+        controls_layout.addWidget(QLabel("Worker Processes"))
+        controls_layout.addWidget(self.workers_spinbox)
+        controls_layout.addWidget(self.incremental_checkbox)
+        self.parquet_checkbox = QCheckBox("Parquet")
+        self.parquet_checkbox.setChecked(self.settings.value("parquet_output", False, type=bool))
+        self.parquet_checkbox.setToolTip(
+            "Also write the results as a typed Parquet dataset next to the CSV file (requires pyarrow)"
+        )
+        controls_layout.addWidget(self.parquet_checkbox)
+        self.approximate_distinct_checkbox = QCheckBox("Approximate unique counts")
+        self.approximate_distinct_checkbox.setChecked(self.settings.value("approximate_distinct", False, type=bool))
+        self.approximate_distinct_checkbox.setToolTip(
+            "Estimate the unique filenames and job numbers of the statistics summary with HyperLogLog in fixed memory "
+            "(about ±0.8%) instead of counting them exactly, for very large log folders"
+        )
+        controls_layout.addWidget(self.approximate_distinct_checkbox)
+        self.profile_checkbox = QCheckBox("Profile")
+        self.profile_checkbox.setChecked(self.settings.value("profile_runs", False, type=bool))
+        self.profile_checkbox.setToolTip(
+            "Record a cProfile dump of extraction and Excel export runs next to the output file"
+        )
+        controls_layout.addWidget(self.profile_checkbox)
         input_layout.addLayout(controls_layout)
 
+        filters_layout = QHBoxLayout()
+        self.include_input = QLineEdit(self.settings.value("include_globs", "", type=str))
+        self.include_input.setPlaceholderText(", ".join(DEFAULT_INCLUDE))
+        self.include_input.setToolTip("File names to process, comma separated glob patterns")
+        self.include_input.editingFinished.connect(self.refresh_total_log_files)
+        self.exclude_input = QLineEdit(self.settings.value("exclude_globs", "", type=str))
+        self.exclude_input.setPlaceholderText("e.g. archive, *_old_message.log")
+        self.exclude_input.setToolTip(
+            "File or folder names, or paths below the log folder, to skip, comma separated glob patterns"
+        )
+        self.exclude_input.editingFinished.connect(self.refresh_total_log_files)
+        self.subfolders_checkbox = QCheckBox("Subfolders")
+        self.subfolders_checkbox.setChecked(self.settings.value("search_subfolders", True, type=bool))
+        self.subfolders_checkbox.setToolTip("Also search the subfolders of the log folder")
+        self.subfolders_checkbox.toggled.connect(self.refresh_total_log_files)
+        self.modified_since_checkbox = QCheckBox("Modified since")
+        self.modified_since_checkbox.setChecked(self.settings.value("filter_modified_since", False, type=bool))
+        self.modified_since_checkbox.setToolTip("Only process log files modified on or after this day")
+        self.modified_since_checkbox.toggled.connect(self.refresh_total_log_files)
+        self.modified_since_date = QDateEdit(
+            self.settings.value("modified_since_date", QDate.currentDate().addDays(-7), type=QDate)
+        )
+        self.modified_since_date.setCalendarPopup(True)
+        self.modified_since_date.setDisplayFormat("yyyy-MM-dd")
+        self.modified_since_date.dateChanged.connect(self.refresh_total_log_files)
+        filters_layout.addWidget(QLabel("Include"))
+        filters_layout.addWidget(self.include_input)
+        filters_layout.addWidget(QLabel("Exclude"))
+        filters_layout.addWidget(self.exclude_input)
+        filters_layout.addWidget(self.subfolders_checkbox)
+        filters_layout.addWidget(self.modified_since_checkbox)
+        filters_layout.addWidget(self.modified_since_date)
+        input_layout.addLayout(filters_layout)
+
         self.layout.addWidget(input_group)
 
         # Log Processing Output Group
@@ -759,6 +872,12 @@ class LogSearcherGUI(QMainWindow):
         self.export_to_excel = QPushButton("Export to Excel")
         self.export_to_excel.setObjectName("export_to_excel")
         self.export_to_excel.clicked.connect(self.export_to_excel_triggered)
+        self.split_workbooks_checkbox = QCheckBox("Split into workbooks")
+        self.split_workbooks_checkbox.setChecked(self.settings.value("excel_split_workbooks", False, type=bool))
+        self.split_workbooks_checkbox.setToolTip(
+            "Continue rows beyond the Excel limit of 1,048,576 rows in further workbooks (<name>_part2.xlsx, ...) "
+            "instead of further sheets of one workbook"
+        )
         self.summarize_button.clicked.connect(self.summarize_filesize)
         self.show_more_statistics = QPushButton("Show More Statistics")
         self.show_more_statistics.setHidden(True)  # Initially hidden
@@ -767,6 +886,7 @@ class LogSearcherGUI(QMainWindow):
         self.csv_sum_layout.addWidget(self.csv_sum_filepath_button)
         self.csv_sum_layout.addWidget(self.summarize_button)
         self.csv_sum_layout.addWidget(self.export_to_excel)
+        self.csv_sum_layout.addWidget(self.split_workbooks_checkbox)
 
         summary_layout.addLayout(self.csv_sum_layout)
 
@@ -783,9 +903,21 @@ class LogSearcherGUI(QMainWindow):
             self.summary_output_text.setText("Calculating Total Filesize in Bytes... please wait.")
             self.progress_bar.setValue(0)
             csv_result_path = self.csv_sum_filepath_input.text()
+
+            # Only the file size column is streamed in a worker thread, the GUI stays responsive
+            self.summarize_button.setEnabled(False)
+            self.summary_worker = GenericWorker("summarize_filesize", csv_result_path)
+            self.summary_worker.statistic_ready.connect(self.show_filesize_summary)
+            self.summary_worker.progress_value.connect(self.update_progress_bar)
+            self.summary_worker.start()
+
+
+    def show_filesize_summary(self, name:str, totals) -> None:
+            self.summarize_button.setEnabled(True)
             try:
-                df = pd.read_csv(csv_result_path)
-                total_filesize = df["Filesize in Bytes"].sum()
+                if isinstance(totals, Exception):
+                    raise totals
+                total_filesize = totals["sum"]
 
                 kb = total_filesize / 1024
                 mb = kb / 1024
@@ -796,7 +928,10 @@ class LogSearcherGUI(QMainWindow):
                     f"In Bytes = {total_filesize:,}\n"
                     f"In KB = {kb:,.2f}\n"
                     f"In MB = {mb:,.2f}\n"
-                    f"In GB = {gb:,.2f}"
+                    f"In GB = {gb:,.2f}\n\n"
+                    f"Entries = {totals['count']:,}\n"
+                    f"Smallest File = {totals['min'] or 0:,} bytes\n"
+                    f"Largest File = {totals['max'] or 0:,} bytes"
                 )
 
                 self.summary_output_text.clear()
@@ -932,12 +1067,19 @@ class LogSearcherGUI(QMainWindow):
     # Worker Thread for exporting CSV files to Excel - To combat GUI freezes
     def start_export_to_excel(self, csv_file_path:str, excel_file_path:str) -> None:
         if csv_file_path:
-            self.worker = GenericWorker("export_excel",csv_file_path, excel_file_path)
+            self.worker = GenericWorker(
+                "export_excel",
+                csv_file_path,
+                excel_file_path,
+                split_workbooks=self.split_workbooks_checkbox.isChecked(),
+                profile=self.profile_checkbox.isChecked(),
+            )
             self.worker.output_window.connect(self.write_to_output_window)
             self.worker.messagebox_info.connect(self.messagebox_popup_info)
             self.worker.messagebox_warn.connect(self.messagebox_popup_warn)
             self.worker.messagebox_crit.connect(self.messagebox_popup_crit)
             self.worker.output_window_clear.connect(self.clear_output_window)
+            self.worker.progress_value.connect(self.update_progress_bar)
             self.worker.start()
         else:
             self.program_output_window.append("Please select a CSV file to export.")
@@ -956,7 +1098,10 @@ class LogSearcherGUI(QMainWindow):
             )
         else:
             # Check if log files have been found in the selected folder
-            files = [f for f in os.listdir(log_filepath) if f.endswith(".log")]
+            try:
+                files = discover_log_files(log_filepath, **self.discovery_filters())
+            except FileNotFoundError:
+                files = []
             if files:
                 self.program_output_window.append(
                     "Starting to process log files... please wait."
@@ -964,11 +1109,22 @@ class LogSearcherGUI(QMainWindow):
                 self.start_button.setEnabled(False)
                 self.cancel_button.setEnabled(True)
                 self.progress_bar.setValue(0)
-                self.worker = GenericWorker("write_log_data_to_csv",log_filepath, output_csv)
+                self.worker = GenericWorker(
+                    "write_log_data_to_csv",
+                    log_filepath,
+                    output_csv,
+                    workers=self.workers_spinbox.value(),
+                    incremental=self.incremental_checkbox.isChecked(),
+                    parquet_output=self.parquet_checkbox.isChecked(),
+                    approximate_distinct=self.approximate_distinct_checkbox.isChecked(),
+                    profile=self.profile_checkbox.isChecked(),
+                    discovery_filters=self.discovery_filters(),
+                )
                 self.worker.output_window.connect(self.update_progress)
                 self.worker.status.connect(self.update_status)
                 self.worker.finished.connect(self.processing_finished)
                 self.worker.progress_value.connect(self.update_progress_bar)
+                self.worker.progress_info.connect(self.update_progress_info)
                 self.worker.start()
             else:
                 self.program_output_window.append(
@@ -1001,14 +1157,21 @@ class LogSearcherGUI(QMainWindow):
         about_text = """
 Lobster Message Log Searcher
 Version 1.0
-Searches for message .log files only! (*_message.log)
+Searches for message .log files only! (*_message.log, also as .gz, .bz2, .xz or .zip)
+Subfolders are searched as well (symlinked folders are skipped), the Include/Exclude patterns and the modification date narrow the files down
 
 Output CSV Headers:
 | Time | Job Number | Profile Name | Filename | Filesize in Bytes
 
 Features:
 - Progress tracking
+- Parallel processing of log files (Worker Processes)
+- Incremental processing, only new log data is appended to the CSV file
+- Compressed logs (.gz, .bz2, .xz, .zip) are read directly, without unpacking them to disk
+- Optional Parquet output for faster statistics
+- Statistics accumulated during processing, the statistics window opens instantly
 - Filesize summarization
+- Excel export of any size, split across sheets above 1048576 rows
 - Recent folders history"""
         self.program_output_window.append(about_text)
 
@@ -1030,21 +1193,52 @@ Features:
         self.settings.setValue("app_geometry", geometry)
         # Save recent folders
         self.settings.setValue("recent_folders", self.recent_folders)
+        self.settings.setValue("worker_processes", self.workers_spinbox.value())
+        self.settings.setValue("incremental_scan", self.incremental_checkbox.isChecked())
+        self.settings.setValue("parquet_output", self.parquet_checkbox.isChecked())
+        self.settings.setValue("approximate_distinct", self.approximate_distinct_checkbox.isChecked())
+        self.settings.setValue("profile_runs", self.profile_checkbox.isChecked())
+        self.settings.setValue("excel_split_workbooks", self.split_workbooks_checkbox.isChecked())
+        self.settings.setValue("include_globs", self.include_input.text())
+        self.settings.setValue("exclude_globs", self.exclude_input.text())
+        self.settings.setValue("search_subfolders", self.subfolders_checkbox.isChecked())
+        self.settings.setValue("filter_modified_since", self.modified_since_checkbox.isChecked())
+        self.settings.setValue("modified_since_date", self.modified_since_date.date())
         super(LogSearcherGUI, self).closeEvent(event)
 
-    # Prints the total log files found in the statusbar
+    # The log file filters of the filter row, as keyword arguments of discover_log_files
+    def discovery_filters(self) -> dict:
+        modified_after = None
+        if self.modified_since_checkbox.isChecked():
+            since = datetime.datetime.combine(self.modified_since_date.date().toPython(), datetime.time.min)
+            modified_after = since.timestamp()
+        return {
+            "include": parse_globs(self.include_input.text()) or DEFAULT_INCLUDE,
+            "exclude": parse_globs(self.exclude_input.text()),
+            "recursive": self.subfolders_checkbox.isChecked(),
+            "modified_after": modified_after,
+        }
+
+    # Prints the total log files found and their size in the statusbar
     def print_total_log_files(self, filepath:str) -> None:
         try:
-            if os.path.isfile(filepath):
-                files = [filepath]
-            elif os.path.isdir(filepath):
-                files = [f for f in os.listdir(filepath) if f.endswith("_message.log")]
-                self.status_bar.showMessage(f"Total log files found: {len(files)}")
+            if os.path.isdir(filepath):
+                # The listing is cached, starting the processing afterwards does not list the folder again
+                files = discover_log_files(filepath, **self.discovery_filters())
+                total_size = sum(file.size for file in files)
+                self.status_bar.showMessage(
+                    f"Total log files found: {len(files)} ({format_bytes(total_size)})"
+                )
             else:
                 self.status_bar.clearMessage()
         except (TypeError, FileNotFoundError):
             self.status_bar.clearMessage()
 
+    def refresh_total_log_files(self) -> None:
+        filepath = self.log_filepath_input.text().strip()
+        if filepath:
+            self.print_total_log_files(filepath)
+
     # ====== Slots for the Signals ====== #
     
     def write_to_output_window(self, message):
@@ -1081,6 +1275,10 @@ Features:
     def update_progress_bar(self, value):
         self.progress_bar.setValue(value)
 
+    def update_progress_info(self, info:dict):
+        self.progress_bar.setValue(int(info["percent"]))
+        self.status_bar.showMessage(format_progress(info))
+
     def processing_finished(self, message):
         self.program_output_window.append(message)
         self.status_bar.showMessage("Processing complete!", 5000)
@@ -1092,6 +1290,7 @@ Features:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Required for the process pool in frozen Windows builds
     app = QApplication(sys.argv)
     window = LogSearcherGUI()
     window.show()
@@ -1,16 +1,23 @@
 import os
-import re
-import csv
 import sys
+import multiprocessing
 import json
+import time
 from datetime import datetime
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QLineEdit, QPushButton, QListWidget, QLabel, QFileDialog, 
-                               QTextEdit, QMenuBar, QMenu, QFrame, QMessageBox, QProgressBar, QStatusBar, QComboBox, QDialog)
-from PySide6.QtGui import QAction, QIcon, QCloseEvent
+                               QTextEdit, QMenuBar, QMenu, QFrame, QMessageBox, QProgressBar, QStatusBar, QComboBox, QDialog,
+                               QCheckBox, QListWidgetItem, QSpinBox)
+from PySide6.QtGui import QAction, QIcon, QCloseEvent, QColor
 from PySide6.QtCore import Qt, QFile, QTextStream, QObject, Signal, QThread, QSettings
 from win32api import GetSystemMetrics
 from _internal.modules.regex_generator import RegexGenerator
+from _internal.modules.record_matcher import RecordMatcher, benchmark_engines, engine_benchmark_lines, write_rows_to_csv
+from _internal.modules.regex_engines import AUTO_ENGINE, available_engines, compile_pattern, select_engine
+from _internal.modules.redos_check import EXPONENTIAL, find_super_linear
+from _internal.modules.pattern_budget import DEFAULT_BLOCK_BUDGET, PatternBudgetExceeded, run_search_with_budget
+from _internal.modules.compressed_input import is_compressed
+from _internal.modules.instrumentation import RunInstrumentation, write_run_report
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 print(SCRIPT_DIR)
@@ -52,12 +59,19 @@ class Worker(QObject):
     output_set_text = Signal(str)
     output_append = Signal(str)
     
-    def __init__(self, file_input, headers_input, pattern_list, output_window):
+    def __init__(self, file_input, headers_input, pattern_list, output_window, streaming=False, record_delimiter="\n",
+                 profile=False, regex_engine=AUTO_ENGINE, compare_engines=False, block_budget=DEFAULT_BLOCK_BUDGET):
         super().__init__()
         self.file_input = file_input
         self.headers_input = headers_input
         self.pattern_list = pattern_list
         self.output_window = output_window
+        self.streaming = streaming  # Scan the file memory-mapped in chunks instead of reading it at once
+        self.record_delimiter = record_delimiter  # Every record (default: line) becomes at most one CSV row
+        self.instrumentation = RunInstrumentation(profile=profile)  # Stage timings, cProfile dump if profile is set
+        self.regex_engine = regex_engine  # "auto", "re", "re2" or "regex", see regex_engines.select_engine
+        self.compare_engines = compare_engines  # Time every installed engine on the file instead of searching
+        self.block_budget = block_budget  # Seconds per block for all patterns in a killable process for flagged patterns, 0 = off
         self._is_running = True
     
     def stop(self):
@@ -70,14 +84,81 @@ class Worker(QObject):
         Main entry point when the thread starts.
         """
         try:
-            self.search_and_save()
+            with self.instrumentation.measure():
+                self.search_and_save()
         except Exception as e:
             self.output_append.emit(f"Exception in worker thread: {str(e)}")
         finally:
             self.finished.emit()
         
+    def create_matcher(self, patterns):
+        matcher = RecordMatcher(patterns, self.record_delimiter, engine=self.regex_engine)
+        self.output_append.emit(f"RegEx engine per pattern: {', '.join(matcher.engines)}")
+        return matcher
+    
     def regex_search(self, text, patterns):
-        return {pattern: re.findall(pattern, text) for pattern in patterns}
+        matcher = self.create_matcher(patterns)
+        return matcher.match_text(text)
+    
+    def regex_search_streaming(self, file_path, patterns):
+        matcher = self.create_matcher(patterns)
+        file_size = os.path.getsize(file_path) or 1
+        return matcher.match_file(
+            file_path,
+            is_cancelled=lambda: not self._is_running,
+            on_progress=lambda bytes_done: self.progress.emit(int(bytes_done / file_size * 100)),
+        )
+    
+    def needs_time_budget(self, patterns):
+        """Whether the search runs under the time budget. Only patterns redos_check flags can stall it,
+        unless they run on RE2, all other searches stay in this thread"""
+        return bool(self.block_budget) and any(
+            find_super_linear(pattern) and select_engine(pattern, self.regex_engine) != "re2" for pattern in patterns
+        )
+    
+    def search_with_time_budget(self, file_path, patterns, headers, output_csv):
+        """Searches in a separate process that is stopped once the patterns exceed the time budget of a block,
+        returns the number of rows written or None if the search was stopped"""
+        self.output_append.emit(
+            f"A pattern can take super-linear time, searching in a separate process where all patterns together may take "
+            f"{self.block_budget} s per block of records. The file is always streamed there, "
+            "'Stream large files' is ignored..."
+        )
+        file_size = os.path.getsize(file_path) or 1
+        try:
+            with self.instrumentation.stage("search"):
+                return run_search_with_budget(
+                    patterns, file_path, headers, output_csv, self.record_delimiter, self.regex_engine,
+                    self.block_budget,
+                    is_cancelled=lambda: not self._is_running,
+                    on_progress=lambda bytes_done: self.progress.emit(int(bytes_done / file_size * 100)),
+                )
+        except PatternBudgetExceeded as e:
+            self.output_append.emit(f"Error: {e} The partial CSV file was removed.")
+            for _, pattern in e.patterns:
+                for finding in find_super_linear(pattern):
+                    self.output_append.emit(f"  {pattern}: {finding}")
+            self.output_append.emit("Rewrite the pattern (e.g. without nested repeats) or search with the re2 engine.")
+            return None
+    
+    def compare_regex_engines(self, file_path, patterns):
+        """Times the search with every installed RegEx engine on the start of the file"""
+        self.output_set_text.emit(f"Comparing RegEx engines on {file_path}...")
+        results = benchmark_engines(patterns, file_path, self.record_delimiter)
+        self.output_append.emit("\n".join(engine_benchmark_lines(results)))
+        self.progress.emit(100)
+    
+    def report_run(self, output_path):
+        """Shows where the time of the search went and writes the run report next to output_path"""
+        try:
+            report, report_path = write_run_report(self.instrumentation, output_path)
+        except OSError as e:
+            self.output_append.emit(f"Could not write the run report: {e}")
+            return
+        self.output_append.emit("\n".join(self.instrumentation.summary_lines(report)))
+        self.output_append.emit(f"Run report written to: {report_path}")
+        if report["profile"]:
+            self.output_append.emit(f"Profile written to: {report['profile']} (open with pstats or snakeviz)")
     
     # Main Method for Searching and Saving the RegEx pattern results to CSV
     def search_and_save(self):
@@ -95,25 +176,37 @@ class Worker(QObject):
                 self.output_append.emit("Error: Please select a log file.")
                 return
 
+            if self.compare_engines:
+                if not patterns:
+                    self.output_append.emit("Error: Please add at least one RegEx pattern.")
+                    return
+                self.compare_regex_engines(file_path, patterns)
+                return
+
             if len(headers) != len(patterns):
                 self.output_append.emit("Error: Number of headers must match number of RegEx patterns")
                 return
 
             try:
                 self.output_set_text.emit("Started processing...")
-                with open(file_path, "r") as file:
-                    text = file.read()
+                if self.needs_time_budget(patterns):
+                    # Searched below in a separate process, the matcher only checks the patterns here
+                    self.create_matcher(patterns)
+                    csv_data = None
+                elif is_compressed(file_path):
+                    # Archives are decompressed as a stream, never into memory or onto disk at once
+                    self.output_append.emit("Streaming compressed file...")
+                    csv_data = self.regex_search_streaming(file_path, patterns)
+                elif self.streaming:
+                    self.output_append.emit("Streaming file in memory-mapped chunks...")
+                    csv_data = self.regex_search_streaming(file_path, patterns)
+                else:
+                    with self.instrumentation.stage("read"), open(file_path, "r") as file:
+                        text = file.read()
+                    csv_data = self.regex_search(text, patterns)
             except Exception as e:
                 self.output_append.emit(f"Error: {e}")
                 return
-            
-            # Check if task should continue:
-            if not self._is_running:
-                self.output_append.emit("Task aborted successfully.")
-                return
-
-            results = self.regex_search(text, patterns)
-            csv_data = list(zip(*results.values()))
 
             today_date = datetime.now()
             formatted_today_date = today_date.strftime("%d.%m.%y-%H%M%S")
@@ -125,21 +218,38 @@ class Worker(QObject):
             
             try:
                 os.makedirs("CSVResults", exist_ok=True)
-                with open(f"CSVResults/regex_matches_{formatted_today_date}.csv", mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(headers)
-                    for index, row in enumerate(csv_data, 1):
-                        self.progress.emit((index + 1) / len(csv_data) * 100)
-                    writer.writerows(csv_data)
-                        
+                output_csv = f"CSVResults/regex_matches_{formatted_today_date}.csv"
+                if csv_data is None:
+                    total_rows = self.search_with_time_budget(file_path, patterns, headers, output_csv)
+                    if total_rows is None and self._is_running:
+                        return
+                else:
+                    # Records are matched while they are written, the matching time is taken out of the writing time
+                    write_start_time = time.perf_counter()
+                    total_rows = write_rows_to_csv(
+                        self.instrumentation.timed(csv_data, "match"),
+                        headers,
+                        output_csv,
+                        is_cancelled=lambda: not self._is_running,
+                    )
+                    self.instrumentation.add_time(
+                        "write", time.perf_counter() - write_start_time - self.instrumentation.stage_seconds("match")
+                    )
+                
+                if not self._is_running:
+                    self.output_append.emit("Task aborted successfully.")
+                    return
+                self.progress.emit(100)
+                self.output_append.emit(f"{total_rows} matching records found.")
                 self.output_append.emit(f"Matches saved to 'CSVResults\\regex_matches_{formatted_today_date}.csv'")
+                self.instrumentation.add_file(file_path, os.path.getsize(file_path), matches=total_rows)
+                self.report_run(output_csv)
             except Exception as e:
                 self.output_set_text.emit(f"Error: {e}")
         except Exception as ex:
             self.output_set_text.emit(f"An exception occurred in method search_and_save: {str(ex)}")
         
         finally:
-            file.close()
             self.finished.emit()
 
 class SettingsWindow(QDialog):
@@ -223,6 +333,8 @@ class RegExSearcher(QMainWindow):
         self.settings = QSettings("Application", "Name")
         geometry = self.settings.value("geometry", bytes())
         self.restoreGeometry(geometry)
+        self.engine_combobox.setCurrentText(self.settings.value("regex_engine", AUTO_ENGINE))
+        self.block_budget_spinbox.setValue(self.settings.value("block_time_budget", DEFAULT_BLOCK_BUDGET, type=int))
         self.create_menu_bar()
         
     def initialize_theme(self, theme_file):
@@ -358,12 +470,52 @@ class RegExSearcher(QMainWindow):
         self.headers_input = QLineEdit()
         self.headers_input.setClearButtonEnabled(True)
 
+        # Record delimiter, every record matching a pattern becomes one CSV row
+        self.record_delimiter_input = QLineEdit()
+        self.record_delimiter_input.setPlaceholderText("Record delimiter (empty = one record per line, escapes like \\n\\n allowed)")
+
+        # Streaming mode for large log files
+        self.streaming_checkbox = QCheckBox("Stream large files (memory-mapped, low memory usage)")
+
+        # Opt-in cProfile dump of the search
+        self.profile_checkbox = QCheckBox("Profile search (cProfile dump next to the CSV result)")
+
+        # RegEx engine, "auto" picks one per pattern, RE2 (linear time) and regex only if installed
+        engine_layout = QHBoxLayout()
+        self.engine_combobox = QComboBox()
+        self.engine_combobox.addItems([AUTO_ENGINE, *available_engines()])
+        self.engine_combobox.setToolTip(
+            "auto: re for ordinary patterns, RE2 for patterns that can backtrack exponentially, regex for its own syntax"
+        )
+        compare_engines_button = QPushButton("Compare Engines")
+        compare_engines_button.setMinimumWidth(80)
+        compare_engines_button.clicked.connect(lambda: self.start_regex_and_save(compare_engines=True))
+        engine_layout.addWidget(QLabel("RegEx engine:"))
+        engine_layout.addWidget(self.engine_combobox)
+        engine_layout.addWidget(compare_engines_button)
+
+        # Time budget per block, searches with flagged patterns run in a process that is stopped when a block exceeds it
+        budget_layout = QHBoxLayout()
+        self.block_budget_spinbox = QSpinBox()
+        self.block_budget_spinbox.setRange(0, 3600)
+        self.block_budget_spinbox.setValue(DEFAULT_BLOCK_BUDGET)
+        self.block_budget_spinbox.setSuffix(" s")
+        self.block_budget_spinbox.setSpecialValueText("Off")
+        self.block_budget_spinbox.setToolTip(
+            "Seconds all patterns together may take per block of records (up to 16 MB) before the search is stopped\n"
+            "and the partial CSV file is removed.\n"
+            "Only used when a pattern is flagged as super-linear (orange), the search then runs in a separate\n"
+            "process that always streams the file, 'Stream large files' is ignored. Off searches without a separate process"
+        )
+        budget_layout.addWidget(QLabel("Time budget per block:"))
+        budget_layout.addWidget(self.block_budget_spinbox)
+
         # Statusbar layout
         statusbar_layout = QHBoxLayout()
         
         # Search button
         self.search_button = QPushButton("Search and Save to CSV")
-        self.search_button.clicked.connect(self.start_regex_and_save)
+        self.search_button.clicked.connect(lambda: self.start_regex_and_save())
         self.stop_search_button = QPushButton("Abort Task")
         self.stop_search_button.setDisabled(True)
         self.stop_search_button.setHidden(True)
@@ -396,6 +548,11 @@ class RegExSearcher(QMainWindow):
         left_layout.addWidget(self.pattern_list)
         left_layout.addWidget(QLabel("Enter CSV Headers (comma separated):"))
         left_layout.addWidget(self.headers_input)
+        left_layout.addWidget(self.record_delimiter_input)
+        left_layout.addWidget(self.streaming_checkbox)
+        left_layout.addWidget(self.profile_checkbox)
+        left_layout.addLayout(engine_layout)
+        left_layout.addLayout(budget_layout)
         left_layout.addWidget(self.search_button)
         left_layout.addWidget(self.stop_search_button)
         left_layout.addWidget(refresh_theme_button)
@@ -416,6 +573,8 @@ class RegExSearcher(QMainWindow):
     def closeEvent(self, event):
         geometry = self.saveGeometry()
         self.settings.setValue("geometry", geometry)
+        self.settings.setValue("regex_engine", self.engine_combobox.currentText())
+        self.settings.setValue("block_time_budget", self.block_budget_spinbox.value())
         super(RegExSearcher, self).closeEvent(event)
         
     # ====================================== End Initialize UI End ====================================== #
@@ -436,15 +595,38 @@ class RegExSearcher(QMainWindow):
             self.output_window.setText(f"An exception occurred: {str(ex)}")
 
     def browse_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Log File", "", "Log File (*.log)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Log File", "", "Log File (*.log *.gz *.bz2 *.xz *.zip)")
         if file_path:
             self.file_input.setText(file_path)
 
     def add_pattern(self):
         pattern = self.pattern_input.text()
-        if pattern:
-            self.pattern_list.addItem(pattern)
-            self.pattern_input.clear()
+        if not pattern:
+            return
+        engine = self.engine_combobox.currentText()
+        try:
+            compile_pattern(pattern, engine)
+        except Exception as ex:
+            QMessageBox.warning(self, "Invalid RegEx pattern", f"The pattern {pattern!r} cannot be used: {ex}")
+            return
+
+        item = QListWidgetItem(pattern)
+        # Patterns that can backtrack catastrophically are flagged, they still run under the time budget
+        findings = find_super_linear(pattern)
+        if findings:
+            item.setToolTip("\n".join(str(finding) for finding in findings))
+            item.setForeground(QColor("#ffc857"))
+            self.output_window.append(f"Warning: the pattern {pattern!r} can take super-linear time:")
+            for finding in findings:
+                self.output_window.append(f"  {finding}")
+            if select_engine(pattern, engine) == "re2":
+                self.output_window.append("  It runs on the RE2 engine, which matches in linear time.")
+            elif any(finding.severity == EXPONENTIAL for finding in findings):
+                self.output_window.append(
+                    "  A single line can stall the search, it is stopped once a block exceeds the time budget."
+                )
+        self.pattern_list.addItem(item)
+        self.pattern_input.clear()
 
     def show_context_menu(self, position):
         context_menu = QMenu()
@@ -499,9 +681,22 @@ class RegExSearcher(QMainWindow):
 
     # ======================== RegExSearch and Save Methods ======================== #
     
-    def start_regex_and_save(self):
+    def get_record_delimiter(self):
+        delimiter = self.record_delimiter_input.text()
+        if not delimiter:
+            return "\n"
+        # Allow escape sequences like "\n\n" or "\t" in the input field
+        return delimiter.encode("latin-1", "backslashreplace").decode("unicode_escape")
+    
+    def start_regex_and_save(self, compare_engines=False):
         self.regex_thread = QThread()
-        self.regex_worker = Worker(self.file_input, self.headers_input, self.pattern_list, self.output_window)
+        self.regex_worker = Worker(self.file_input, self.headers_input, self.pattern_list, self.output_window,
+                                   streaming=self.streaming_checkbox.isChecked(),
+                                   record_delimiter=self.get_record_delimiter(),
+                                   profile=self.profile_checkbox.isChecked(),
+                                   regex_engine=self.engine_combobox.currentText(),
+                                   compare_engines=compare_engines,
+                                   block_budget=self.block_budget_spinbox.value())
         self.regex_worker.moveToThread(self.regex_thread)
         
         # Connect Signals
@@ -532,6 +727,7 @@ class RegExSearcher(QMainWindow):
         self.progress_bar.reset()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Required for the time budget search processes in frozen Windows builds
     app = QApplication(sys.argv)
     window = RegExSearcher()
     window.show()
@@ -0,0 +1,54 @@
+import mmap
+import os
+
+# Bytes per block of a memory-mapped file, a block grows if a single record is larger
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def release_pages(mapped_file:mmap.mmap, released:int, pos:int) -> int:
+    """Drops the pages between released and pos from memory, they are not needed anymore.
+
+    Returns:
+        The offset up to which pages have been released.
+    """
+    release_end = pos - pos % mmap.ALLOCATIONGRANULARITY
+    if release_end > released and hasattr(mapped_file, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+        mapped_file.madvise(mmap.MADV_DONTNEED, released, release_end - released)
+        return release_end
+    return released
+
+
+def iter_mapped_blocks(filepath:str, delimiter:bytes=b"\n", chunk_size:int=DEFAULT_CHUNK_SIZE, is_cancelled=None):
+    """Yields a memory-mapped file in blocks that end right after a delimiter.
+
+    A record never gets split across two blocks. Pages of blocks already
+    handed out are released again, memory stays flat regardless of the file size.
+
+    Args:
+        filepath: Path to the file.
+        delimiter: Bytes separating two records.
+        chunk_size: Approximate size of a block, a block grows if a record is larger.
+        is_cancelled: Optional callable, iteration stops once it returns True.
+
+    Yields:
+        A tuple of the block as bytes and the end offset of the block in the file.
+    """
+    if os.path.getsize(filepath) == 0:
+        return
+
+    with open(filepath, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        size = len(mapped_file)
+        pos = 0
+        released = 0
+        while pos < size:
+            if is_cancelled and is_cancelled():
+                return
+            end = min(pos + chunk_size, size)
+            if end < size:
+                cut = mapped_file.rfind(delimiter, pos, end)
+                if cut == -1:
+                    cut = mapped_file.find(delimiter, end)
+                end = size if cut == -1 else cut + len(delimiter)
+            yield mapped_file[pos:end], end
+            pos = end
+            released = release_pages(mapped_file, released, pos)
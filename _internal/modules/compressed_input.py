@@ -0,0 +1,110 @@
+import bz2
+import gzip
+import lzma
+import os
+import zipfile
+
+from _internal.modules.log_reader import DEFAULT_CHUNK_SIZE, read_byte_blocks
+
+# Single stream codecs of the standard library by file extension
+STREAM_CODECS = {
+    ".gz": lambda raw: gzip.GzipFile(fileobj=raw, mode="rb"),
+    ".bz2": bz2.BZ2File,
+    ".xz": lzma.LZMAFile,
+}
+ZIP_SUFFIX = ".zip"
+COMPRESSED_SUFFIXES = (*STREAM_CODECS, ZIP_SUFFIX)
+
+
+def compression_suffix(filepath:str) -> str:
+    """Returns the compression extension of a file (".gz", ".bz2", ".xz", ".zip"), "" for plain files."""
+    suffix = os.path.splitext(filepath)[1].lower()
+    return suffix if suffix in COMPRESSED_SUFFIXES else ""
+
+
+def is_compressed(filepath:str) -> bool:
+    return bool(compression_suffix(filepath))
+
+
+def strip_compression_suffix(filename:str) -> str:
+    """Returns the name of the log inside a compressed file, e.g. "a_message.log" for "a_message.log.gz"."""
+    suffix = compression_suffix(filename)
+    return filename[:-len(suffix)] if suffix else filename
+
+
+def zip_members(archive:zipfile.ZipFile, member_suffix:str=None) -> list:
+    """Returns the file members of a zip archive in archive order, only those ending in member_suffix if given."""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir() and (member_suffix is None or info.filename.endswith(member_suffix))
+    ]
+
+
+def iter_log_blocks(filepath:str, start_offset:int=0, include_partial:bool=True, delimiter:bytes=b"\n",
+                    member_suffix:str=None, chunk_size:int=DEFAULT_CHUNK_SIZE, skip_bytes:int=0):
+    """Reads a plain or compressed log file in blocks of complete records.
+
+    Plain files are read like read_byte_blocks. Files ending in .gz, .bz2 or
+    .xz are decompressed as a stream with the standard library codecs, the
+    members of a .zip archive are read one after the other. Nothing is
+    written to disk, decompression only costs CPU. A record never spans two
+    zip members.
+
+    Offsets are positions in the file on disk. For compressed files they are
+    the compressed bytes consumed so far, good for progress, and only the
+    last block ends exactly at the file size. start_offset of a compressed
+    file must be 0 or the end of an earlier complete read (concatenated gzip,
+    bzip2 and xz streams continue there); compressed files always include an
+    incomplete last record, they do not grow while being read. skip_bytes
+    skips the start of the decompressed data of a .gz, .bz2 or .xz file
+    instead, e.g. the part of a rotated log that was read before it was
+    compressed; it must be the end of a record.
+
+    Args:
+        filepath: Path to the log file.
+        start_offset: Offset to start reading at.
+        include_partial: Whether an incomplete last record of a plain file is yielded.
+        delimiter: Bytes ending a record, blocks are cut after it.
+        member_suffix: Only zip members ending in this are read, all members if None.
+        chunk_size: Number of (decompressed) bytes to read per block.
+        skip_bytes: Number of decompressed bytes of a .gz, .bz2 or .xz file to skip.
+
+    Yields:
+        A tuple of the block's bytes and the file offset right after it.
+    """
+    suffix = compression_suffix(filepath)
+    with open(filepath, "rb") as raw:
+        raw.seek(start_offset)
+        if not suffix:
+            yield from read_byte_blocks(raw, chunk_size, include_partial, delimiter)
+            return
+
+        if suffix == ZIP_SUFFIX:
+            blocks = _iter_zip_blocks(raw, delimiter, member_suffix, chunk_size)
+        else:
+            stream = STREAM_CODECS[suffix](raw)
+            if skip_bytes:
+                stream.seek(skip_bytes)  # Decompresses and discards the skipped bytes
+            blocks = _iter_stream_blocks(stream, raw, delimiter, chunk_size)
+
+        # One block is held back, so the last one can be reported at the end of the file
+        previous = None
+        for block in blocks:
+            if previous is not None:
+                yield previous
+            previous = block
+        if previous is not None:
+            yield previous[0], os.fstat(raw.fileno()).st_size
+
+
+def _iter_stream_blocks(stream, raw, delimiter:bytes, chunk_size:int):
+    with stream:
+        for data, _ in read_byte_blocks(stream, chunk_size, True, delimiter):
+            yield data, raw.tell()
+
+
+def _iter_zip_blocks(raw, delimiter:bytes, member_suffix:str, chunk_size:int):
+    with zipfile.ZipFile(raw) as archive:
+        for info in zip_members(archive, member_suffix):
+            with archive.open(info) as member:
+                yield from _iter_stream_blocks(member, raw, delimiter, chunk_size)
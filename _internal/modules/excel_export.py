@@ -0,0 +1,133 @@
+import csv
+import os
+
+# Rows of one Excel worksheet, including the header row
+EXCEL_MAX_ROWS = 1048576
+DEFAULT_SHEET_NAME = "Statistics Data"
+# Bytes of the CSV file inspected to detect its delimiter
+SNIFF_SIZE = 2048
+
+
+def sniff_delimiter(csv_path:str, encoding:str="utf-8") -> str:
+    with open(csv_path, encoding=encoding, newline="") as file:
+        sample = file.read(SNIFF_SIZE)
+    try:
+        return csv.Sniffer().sniff(sample).delimiter
+    except csv.Error:
+        return ","
+
+
+def workbook_part_path(excel_path:str, part:int) -> str:
+    """Returns the path of the part-th workbook, the first part keeps excel_path."""
+    if part == 1:
+        return excel_path
+    stem, extension = os.path.splitext(excel_path)
+    return f"{stem}_part{part}{extension}"
+
+
+class ExcelStreamWriter:
+    """Streams a CSV file row by row into Excel workbooks.
+
+    The workbooks are written in xlsxwriter's constant_memory mode, so only
+    the current row is held in memory whatever the size of the CSV file.
+    Numeric strings are stored as numbers. Rows beyond the Excel limit of
+    1,048,576 rows per sheet continue on a new sheet, or in a new workbook
+    with split_workbooks, each starting with the header row again.
+    Requires xlsxwriter.
+    """
+
+    def __init__(self, excel_path:str, sheet_name:str=DEFAULT_SHEET_NAME,
+                 split_workbooks:bool=False, max_rows:int=EXCEL_MAX_ROWS):
+        try:
+            import xlsxwriter
+        except ImportError as ex:
+            raise ImportError("Excel export requires xlsxwriter, install it with 'pip install xlsxwriter'.") from ex
+
+        self.xlsxwriter = xlsxwriter
+        self.excel_path = excel_path
+        self.sheet_name = sheet_name
+        self.split_workbooks = split_workbooks
+        self.rows_per_sheet = max_rows - 1  # The header row is repeated on every sheet
+        self.workbook = None
+        self.worksheet = None
+        self.workbook_paths = []
+        self.sheet_count = 0
+        self.row_index = 0
+
+    def new_workbook(self) -> None:
+        if self.workbook is not None:
+            self.workbook.close()
+        path = workbook_part_path(self.excel_path, len(self.workbook_paths) + 1)
+        self.workbook = self.xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_numbers": True})
+        self.workbook_paths.append(path)
+
+    def new_sheet(self, header:list) -> None:
+        if self.workbook is None or (self.split_workbooks and self.sheet_count):
+            self.new_workbook()
+        self.sheet_count += 1
+        part = len(self.workbook_paths) if self.split_workbooks else self.sheet_count
+        name = self.sheet_name if part == 1 else f"{self.sheet_name} {part}"
+        self.worksheet = self.workbook.add_worksheet(name[:31])
+        self.worksheet.write_row(0, 0, header)
+        self.row_index = 1
+
+    def write_csv(self, csv_path:str, encoding:str="utf-8", delimiter:str=None,
+                  is_cancelled=None, on_progress=None) -> int:
+        """Writes all rows of a CSV file, its first row being the header.
+
+        Args:
+            csv_path: Path of the CSV file.
+            encoding: Encoding of the CSV file.
+            delimiter: Field delimiter, sniffed from the start of the file if None.
+            is_cancelled: Callable returning True to stop, checked every 10000 rows.
+            on_progress: Callable receiving the progress in percent of the CSV file read.
+
+        Returns:
+            The number of data rows written.
+        """
+        delimiter = delimiter or sniff_delimiter(csv_path, encoding)
+        file_size = os.path.getsize(csv_path) or 1
+        total_rows = 0
+        last_percent = -1
+
+        with open(csv_path, encoding=encoding, newline="") as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            header = next(reader, [])
+            self.new_sheet(header)
+            for row in reader:
+                if self.row_index > self.rows_per_sheet:
+                    self.new_sheet(header)
+                self.worksheet.write_row(self.row_index, 0, row)
+                self.row_index += 1
+                total_rows += 1
+
+                if total_rows % 10000 == 0:
+                    if is_cancelled and is_cancelled():
+                        break
+                    if on_progress:
+                        percent = min(100, file.buffer.tell() * 100 // file_size)
+                        if percent != last_percent:
+                            on_progress(percent)
+                            last_percent = percent
+        return total_rows
+
+    def close(self) -> None:
+        if self.workbook is not None:
+            self.workbook.close()
+            self.workbook = None
+
+
+def stream_csv_to_excel(csv_path:str, excel_path:str, split_workbooks:bool=False,
+                        is_cancelled=None, on_progress=None) -> tuple:
+    """Streams a CSV file into one or more Excel workbooks.
+
+    Returns:
+        A tuple of the number of data rows written, the number of sheets and
+        the list of workbook paths.
+    """
+    writer = ExcelStreamWriter(excel_path, split_workbooks=split_workbooks)
+    try:
+        total_rows = writer.write_csv(csv_path, is_cancelled=is_cancelled, on_progress=on_progress)
+    finally:
+        writer.close()
+    return total_rows, writer.sheet_count, writer.workbook_paths
@@ -0,0 +1,203 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+from _internal.modules.progress import format_bytes, format_duration
+from _internal.modules.resource_usage import peak_rss_bytes
+
+# Functions listed in the text version of a cProfile dump
+PROFILE_TOP_FUNCTIONS = 40
+
+
+def run_report_path(output_path:str) -> str:
+    """Returns the path of the run report written alongside an output file."""
+    return f"{os.path.splitext(output_path)[0]}.report.json"
+
+
+def profile_dump_path(output_path:str) -> str:
+    """Returns the path of the cProfile dump written alongside an output file."""
+    return f"{os.path.splitext(output_path)[0]}.prof"
+
+
+class RunInstrumentation:
+    """Records where the time of a run goes: wall time per stage, throughput
+    per file and the peak memory of the process.
+
+    A stage is a named part of the work such as "read", "parse" or "write".
+    Its seconds and calls are summed over the run, stages that run in
+    different threads overlap, so their sum can exceed the elapsed time.
+    Timing is taken per block or batch, not per line, and costs next to
+    nothing. With profile=True, the thread that calls start() also runs
+    under cProfile, other threads (reader, writer) and worker processes are
+    not profiled.
+    """
+
+    def __init__(self, profile:bool=False):
+        self.profile = profile
+        self.profiler = None
+        self.stages = {}  # Stage name -> [seconds, calls]
+        self.files = []
+        self.start_time = None
+        self.elapsed = None
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        """Starts timing the whole run, and profiling it if enabled."""
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start_time = time.perf_counter()
+
+    def stop(self) -> None:
+        """Stops timing and profiling, later calls keep the first elapsed time."""
+        if self.start_time is None or self.elapsed is not None:
+            return
+        self.elapsed = time.perf_counter() - self.start_time
+        if self.profiler:
+            self.profiler.disable()
+
+    @contextmanager
+    def measure(self):
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    @contextmanager
+    def stage(self, name:str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def add_time(self, name:str, seconds:float, calls:int=1) -> None:
+        with self.lock:
+            totals = self.stages.setdefault(name, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+
+    def stage_seconds(self, name:str) -> float:
+        with self.lock:
+            return self.stages.get(name, [0.0, 0])[0]
+
+    def timed(self, iterable, name:str):
+        """Yields the items of iterable and adds the time spent producing them to stage name."""
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        while True:
+            start_time = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, perf_counter() - start_time, 0)
+                return
+            self.add_time(name, perf_counter() - start_time)
+            yield item
+
+    def add_file(self, filepath:str, bytes_read:int, lines:int=None, matches:int=None, seconds:float=None) -> None:
+        with self.lock:
+            self.files.append({
+                "file": filepath,
+                "bytes": bytes_read,
+                "lines": lines,
+                "matches": matches,
+                "seconds": seconds,
+            })
+
+    def report(self) -> dict:
+        """Returns the run report as a JSON serialisable dict."""
+        if self.elapsed is not None:
+            elapsed = self.elapsed
+        else:
+            elapsed = time.perf_counter() - self.start_time if self.start_time is not None else 0.0
+        total_bytes = sum(file["bytes"] for file in self.files)
+        total_lines = sum(file["lines"] or 0 for file in self.files)
+        total_matches = sum(file["matches"] or 0 for file in self.files)
+        files = []
+        for file in self.files:
+            seconds = file["seconds"]
+            files.append({
+                **file,
+                "mb_per_s": file["bytes"] / seconds / 1024 ** 2 if seconds else None,
+                "lines_per_s": file["lines"] / seconds if seconds and file["lines"] is not None else None,
+            })
+        return {
+            "elapsed": elapsed,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": {
+                name: {"seconds": seconds, "calls": calls, "share": seconds / elapsed if elapsed else None}
+                for name, (seconds, calls) in self.stages.items()
+            },
+            "totals": {
+                "files": len(self.files),
+                "bytes": total_bytes,
+                "lines": total_lines,
+                "matches": total_matches,
+                "mb_per_s": total_bytes / elapsed / 1024 ** 2 if elapsed else None,
+                "lines_per_s": total_lines / elapsed if elapsed else None,
+            },
+            "files": files,
+        }
+
+    def summary_lines(self, report:dict=None) -> list:
+        """Returns the report as lines of text for the output window."""
+        report = report or self.report()
+        totals = report["totals"]
+        lines = [f"Run time: {format_duration(report['elapsed'])} ({report['elapsed']:.2f} s)"]
+        if totals["files"]:
+            lines.append(
+                f"Read {format_bytes(totals['bytes'])} in {totals['files']} files at {totals['mb_per_s']:.1f} MB/s"
+                + (f", {totals['lines']:,} lines ({totals['lines_per_s']:,.0f} lines/s)" if totals["lines"] else "")
+                + f", {totals['matches']:,} matches"
+            )
+        if report["stages"]:
+            lines.append("Time per stage:")
+        for name, stage in sorted(report["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            share = f" ({stage['share']:.0%})" if stage["share"] is not None else ""
+            lines.append(f"  {name:<10} {stage['seconds']:8.2f} s{share}")
+        if report["peak_rss_bytes"] is not None:
+            lines.append(f"Peak memory: {format_bytes(report['peak_rss_bytes'])}")
+        return lines
+
+    def save(self, report_path:str, report:dict=None) -> None:
+        report = report or self.report()
+        temp_file = f"{report_path}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(temp_file, report_path)
+
+    def dump_profile(self, profile_path:str) -> str:
+        """Writes the cProfile statistics for pstats/snakeviz to profile_path and
+        returns the functions with the highest cumulative time as text."""
+        if self.profiler is None:
+            return ""
+        self.profiler.dump_stats(profile_path)
+        text = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return text.getvalue()
+
+
+def write_run_report(instrumentation:RunInstrumentation, output_path:str) -> tuple:
+    """Stops the instrumentation and writes its report, and the cProfile dump if
+    profiling was enabled, alongside output_path.
+
+    Returns:
+        A tuple of the report dict and the path of the report file.
+    """
+    instrumentation.stop()
+    report = instrumentation.report()
+    report["output"] = output_path
+    report["profile"] = None
+    if instrumentation.profiler:
+        report["profile"] = profile_dump_path(output_path)
+        instrumentation.dump_profile(report["profile"])
+    report_path = run_report_path(output_path)
+    instrumentation.save(report_path, report)
+    return report, report_path
@@ -0,0 +1,136 @@
+import re
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+_REPEATS = tuple(
+    getattr(sre_constants, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+_GROUPS = tuple(
+    getattr(sre_constants, name) for name in ("SUBPATTERN", "ATOMIC_GROUP")
+    if hasattr(sre_constants, name)
+)
+
+
+def required_literals(pattern) -> list:
+    """Returns literal substrings every match of pattern contains.
+
+    The parsed pattern is walked along the parts every match goes through:
+    consecutive literal characters, groups and repeats of at least one. Any
+    alternation, character class, optional part or case-insensitive flag
+    ends the current literal. Returns an empty list if nothing is certain.
+
+    Args:
+        pattern: A str pattern, or a bytes pattern whose literals are returned as bytes.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []  # Syntax of another engine, e.g. "\p{L}" of the regex package
+    if parsed.state.flags & re.IGNORECASE:
+        return []
+    runs = []
+    current = _collect_literals(parsed, runs, [])
+    _flush(current, runs)
+    # The parser gives the code point of every literal character, the byte value for bytes patterns
+    if isinstance(pattern, bytes):
+        return [bytes(run) for run in runs]
+    return ["".join(map(chr, run)) for run in runs]
+
+
+def _collect_literals(items, literals:list, current:list) -> list:
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            current.append(av)
+        elif op in _GROUPS:
+            if op is sre_constants.SUBPATTERN:
+                _, add_flags, _, sub_pattern = av
+                if add_flags & re.IGNORECASE:
+                    current = _flush(current, literals)
+                    continue
+            else:
+                sub_pattern = av
+            # Literals before, inside and after a group follow each other in the match
+            current = _collect_literals(sub_pattern, literals, current)
+        elif op in _REPEATS:
+            current = _flush(current, literals)
+            minimum, _, sub_pattern = av
+            if minimum >= 1:
+                _flush(_collect_literals(sub_pattern, literals, []), literals)
+        else:
+            current = _flush(current, literals)
+    return current
+
+
+def _flush(current:list, literals:list) -> list:
+    if current:
+        literals.append(current)
+    return []
+
+
+# Engines whose pattern syntax sre_parse reads the same way, the "regex" package has
+# syntax of its own, e.g. "(?:abc){e<=1}" is a fuzzy match there but literal text for sre_parse
+LITERAL_ENGINES = frozenset({"re", "re2"})
+
+
+def longest_required_literal(pattern, engine:str="re"):
+    """Returns the longest literal every match of pattern contains, None if there is none.
+
+    The longest literal is usually the rarest one, so it filters best. There
+    is no literal for patterns compiled with an engine outside LITERAL_ENGINES.
+
+    Args:
+        pattern: A str or bytes pattern.
+        engine: Name of the engine the pattern is compiled with.
+    """
+    if engine not in LITERAL_ENGINES:
+        return None
+    return max(required_literals(pattern), key=len, default=None)
+
+
+def delimiter_can_overlap(delimiter) -> bool:
+    """Whether two occurrences of delimiter can overlap, e.g. "\\n\\n" in three newlines.
+
+    Records of such a delimiter cannot be found from a position in the middle
+    of the text, iter_candidate_records must not be used for them.
+    """
+    return any(delimiter[:size] == delimiter[-size:] for size in range(1, len(delimiter)))
+
+
+def iter_candidate_records(text, delimiter, literals:list):
+    """Yields the records of text that contain at least one of literals, in order.
+
+    Works on str or bytes, delimiter and literals must be of the same type and
+    the delimiter must not overlap itself (see delimiter_can_overlap). The
+    records are the parts text.split(delimiter) returns, but only the regions
+    around the found literals are looked at, records without any literal are
+    never split off or copied.
+    """
+    delimiter_length = len(delimiter)
+    text_length = len(text)
+    find = text.find
+    rfind = text.rfind
+    records = {}  # Start offset -> end offset
+    for literal in literals:
+        literal_length = len(literal)
+        pos = find(literal)
+        while pos != -1:
+            if find(delimiter, max(pos - delimiter_length + 1, 0), pos + literal_length + delimiter_length - 1) != -1:
+                # The occurrence crosses a delimiter, it is not part of a record
+                pos = find(literal, pos + 1)
+                continue
+            start = rfind(delimiter, 0, pos)
+            start = 0 if start == -1 else start + delimiter_length
+            end = find(delimiter, pos + literal_length)
+            if end == -1:
+                end = text_length
+            records[start] = end
+            # Further occurrences in the same record do not add anything
+            pos = find(literal, end + delimiter_length) if end < text_length else -1
+    for start in sorted(records):
+        yield text[start:records[start]]
@@ -0,0 +1,195 @@
+import fnmatch
+import os
+import threading
+import time
+
+from _internal.modules.compressed_input import COMPRESSED_SUFFIXES
+
+LOG_FILE_SUFFIX = "_message.log"
+# Message logs and rotated ones compressed with gzip, bzip2, xz or zip, other archives are no log sources
+DEFAULT_INCLUDE = (
+    f"*{LOG_FILE_SUFFIX}",
+    *(f"*{LOG_FILE_SUFFIX}{suffix}" for suffix in COMPRESSED_SUFFIXES),
+)
+# Seconds a cached folder listing is reused as long as none of its folders has changed
+DISCOVERY_CACHE_MAX_AGE = 300
+
+
+class LogFile:
+    """A discovered log file with the size and modification time of its directory entry."""
+
+    __slots__ = ("path", "size", "mtime")
+
+    def __init__(self, path:str, size:int, mtime:float):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+    def __repr__(self) -> str:
+        return f"LogFile({self.path!r}, size={self.size}, mtime={self.mtime})"
+
+
+def parse_globs(text:str) -> tuple:
+    """Splits comma or semicolon separated glob patterns, e.g. from an input field."""
+    return tuple(glob.strip() for glob in text.replace(";", ",").split(",") if glob.strip())
+
+
+def _matches_any(name:str, globs:tuple) -> bool:
+    # Case-insensitive on every platform, rotated logs are often named e.g. "X_message.log.GZ"
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, glob.lower()) for glob in globs)
+
+
+def _is_excluded(relative_path:str, name:str, exclude:tuple) -> bool:
+    # Globs match the name or the path below the root, e.g. "*.bak" or "archive/*"
+    return bool(exclude) and (_matches_any(name, exclude) or _matches_any(relative_path, exclude))
+
+
+def scan_log_folder(folder:str, include:tuple=DEFAULT_INCLUDE, exclude:tuple=(), recursive:bool=True,
+                    folder_mtimes:dict=None) -> list:
+    """Walks a folder with os.scandir and returns a LogFile for every file whose name matches include.
+
+    The size and mtime come from the directory entries, on Windows they are
+    part of the listing and need no extra request per file, which matters on
+    network shares. Only files matching include are stat'ed at all. Excluded
+    subfolders are not entered. Folders that cannot be read are skipped.
+    Symlinked folders and junctions are not entered either, a link pointing
+    back up the tree would make the walk endless.
+    Files are returned in listing order, the files of a folder before its subfolders.
+
+    Args:
+        folder_mtimes: Optional dict, filled with the mtime of every subfolder
+            entered by its path.
+    """
+    log_files = []
+    folders = [(folder, "")]
+    while folders:
+        current, relative = folders.pop(0)
+        subfolders = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    relative_path = f"{relative}{entry.name}"
+                    if _is_excluded(relative_path, entry.name, exclude):
+                        continue
+                    try:
+                        if entry.is_file():
+                            if _matches_any(entry.name, include):
+                                stat = entry.stat()
+                                log_files.append(LogFile(entry.path, stat.st_size, stat.st_mtime))
+                        elif recursive and entry.is_dir(follow_symlinks=False) and not _is_junction(entry):
+                            subfolders.append((entry.path, f"{relative_path}/"))
+                            if folder_mtimes is not None:
+                                folder_mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime
+                    except OSError:
+                        continue  # Removed or inaccessible while listing
+        except OSError:
+            continue
+        folders[:0] = subfolders
+    return log_files
+
+
+def _is_junction(entry:os.DirEntry) -> bool:
+    # Windows junctions are no symlinks for is_dir(), DirEntry.is_junction() exists from Python 3.12 on
+    is_junction = getattr(entry, "is_junction", None)
+    return bool(is_junction and is_junction())
+
+
+def _folders_unchanged(folder_mtimes:dict) -> bool:
+    for path, mtime in folder_mtimes.items():
+        try:
+            if os.stat(path).st_mtime != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class DiscoveryCache:
+    """Keeps folder listings for the session, so reopening a folder (e.g. from
+    the recent folders) does not list a large network share again.
+
+    A listing is reused while the mtimes of the root folder and of all its
+    subfolders are unchanged, a folder's mtime changes when files are added to,
+    removed from or renamed in it. Checking them takes one stat per folder
+    instead of listing every folder again. Sizes and mtimes of files that are
+    only appended to are not checked, a listing is reused for at most max_age
+    seconds.
+    """
+
+    def __init__(self, max_age:float=DISCOVERY_CACHE_MAX_AGE):
+        self.max_age = max_age
+        # (folder, include, exclude, recursive) -> ({folder path: mtime}, time listed, log files)
+        self.listings = {}
+        self.lock = threading.Lock()
+
+    def get(self, key:tuple) -> list:
+        with self.lock:
+            cached = self.listings.get(key)
+        if cached is None:
+            return None
+        folder_mtimes, listed_at, log_files = cached
+        if time.monotonic() - listed_at > self.max_age or not _folders_unchanged(folder_mtimes):
+            return None
+        return log_files
+
+    def put(self, key:tuple, folder_mtimes:dict, log_files:list) -> None:
+        with self.lock:
+            self.listings[key] = (folder_mtimes, time.monotonic(), log_files)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.listings.clear()
+
+
+_session_cache = DiscoveryCache()
+
+
+def discover_log_files(filepath:str, include:tuple=DEFAULT_INCLUDE, exclude:tuple=(), recursive:bool=True,
+                       modified_after:float=None, modified_before:float=None, use_cache:bool=True) -> list:
+    """Returns the log files of a folder and its subfolders, or the file itself.
+
+    Args:
+        filepath: A log folder, or a single log file which is returned as is.
+        include: Glob patterns of the file names to return.
+        exclude: Glob patterns of file or folder names, or of paths relative to
+            filepath, to leave out.
+        recursive: Whether subfolders are searched.
+        modified_after: Only files modified at or after this timestamp.
+        modified_before: Only files modified before this timestamp.
+        use_cache: Whether a listing from earlier in the session may be reused.
+            The listing is refreshed (and cached) otherwise.
+
+    Returns:
+        A list of LogFile in listing order.
+
+    Raises:
+        FileNotFoundError: If filepath is neither a file nor a folder.
+    """
+    try:
+        stat = os.stat(filepath)
+    except (OSError, TypeError, ValueError):
+        raise FileNotFoundError("Invalid filepath.")
+    if os.path.isfile(filepath):
+        return [LogFile(filepath, stat.st_size, stat.st_mtime)]
+    if not os.path.isdir(filepath):
+        raise FileNotFoundError("Invalid filepath.")
+
+    key = (os.path.abspath(filepath), tuple(include), tuple(exclude), recursive)
+    log_files = _session_cache.get(key) if use_cache else None
+    if log_files is None:
+        folder_mtimes = {filepath: stat.st_mtime}
+        log_files = scan_log_folder(filepath, tuple(include), tuple(exclude), recursive, folder_mtimes)
+        _session_cache.put(key, folder_mtimes, log_files)
+
+    if modified_after is not None or modified_before is not None:
+        log_files = [
+            log_file for log_file in log_files
+            if (modified_after is None or log_file.mtime >= modified_after)
+            and (modified_before is None or log_file.mtime < modified_before)
+        ]
+    return list(log_files)
+
+
+def clear_discovery_cache() -> None:
+    _session_cache.clear()
@@ -0,0 +1,81 @@
+import re
+
+from _internal.modules.regex_engines import AUTO_ENGINE, compile_pattern
+
+# Field patterns of a Lobster "_message.log" line, in CSV column order:
+# Time | Job Number | Profile Name | Filename | Filesize in Bytes
+TIME_PATTERN = r"\b(\d{2}:\d{2}:\d{2})\b"
+JOB_NUMBER_PATTERN = r"Job:\s+((?:\d+|GENERAL))"
+PROFILENAME_PATTERN = r"\[(.*?)]"
+FILENAME_PATTERN = r"Start processing data of file '(.*?)'"
+FILESIZE_PATTERN = r"length=(\d+),"
+
+FIELD_PATTERNS = (
+    TIME_PATTERN,
+    JOB_NUMBER_PATTERN,
+    PROFILENAME_PATTERN,
+    FILENAME_PATTERN,
+    FILESIZE_PATTERN,
+)
+
+# Literals every matching line must contain. Checked with the "in" operator
+# before the regex engine is touched, which rejects almost all lines of a log.
+GUARD_LITERALS = ("Start processing data of file '", "length=", "Job:", "[")
+
+
+class LogLineExtractor:
+    """Extracts the five CSV fields from a single Lobster message log line.
+
+    A line is first checked for the literals every matching line contains,
+    which rejects almost all lines without touching the regex engine. Lines
+    passing the guard are searched with the precompiled field patterns, so the
+    output is identical to one ``re.search`` per field.
+
+    The field patterns are compiled with regex_engines.compile_pattern, with
+    engine="auto" the default patterns all stay on ``re``.
+    """
+
+    def __init__(self, field_patterns:tuple=FIELD_PATTERNS, guard_literals:tuple=GUARD_LITERALS,
+                 engine:str=AUTO_ENGINE):
+        self.field_patterns = field_patterns
+        self.guard_literals = guard_literals
+        compiled = [compile_pattern(pattern, engine) for pattern in field_patterns]
+        self._searches = tuple(regex.search for regex, _ in compiled)
+        self.engines = [name for _, name in compiled]
+
+    def extract(self, line:str) -> list:
+        """Returns the extracted fields of a line.
+
+        Args:
+            line: A single line from the log file.
+
+        Returns:
+            A list with time, job number, profile name, filename and filesize,
+            or None if the line does not contain all fields.
+        """
+        for literal in self.guard_literals:
+            if literal not in line:
+                return None
+        row = []
+        for search in self._searches:
+            match = search(line)
+            if match is None:
+                return None
+            row.append(match.group(1))
+        return row
+
+    def extract_lines(self, lines) -> list:
+        """Returns the extracted fields of all matching lines of an iterable."""
+        extract = self.extract
+        return [row for row in map(extract, lines) if row is not None]
+
+
+def extract_info_from_line_legacy(line:str) -> list:
+    """Reference implementation with one ``re.search`` per field.
+
+    Kept for benchmarks and equivalence checks against LogLineExtractor.
+    """
+    matches = [re.search(pattern, line) for pattern in FIELD_PATTERNS]
+    if all(matches):
+        return [match.group(1) for match in matches]
+    return None
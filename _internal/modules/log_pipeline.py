@@ -0,0 +1,417 @@
+import os
+import time
+from contextlib import closing
+
+from _internal.modules.compressed_input import ZIP_SUFFIX, compression_suffix, iter_log_blocks
+from _internal.modules.instrumentation import RunInstrumentation
+from _internal.modules.log_discovery import LOG_FILE_SUFFIX, LogFile, discover_log_files
+from _internal.modules.log_extractor import LogLineExtractor
+from _internal.modules.log_reader import split_block
+from _internal.modules.output_sinks import (
+    DEFAULT_CSV_BUFFER_SIZE, CsvSink, ParquetSink, fresh_parquet_sidecar, parquet_sidecar_path,
+)
+from _internal.modules.parallel_scan import ParallelBlockParser, default_worker_count
+from _internal.modules.progress import ProgressReporter, format_progress
+from _internal.modules.run_summary import RunSummary, load_run_summary
+from _internal.modules.scan_index import ScanIndex
+from _internal.modules.staged_io import BackgroundWriter, prefetch
+
+CSV_HEADER = ["Time", "Job Number", "Profile Name", "Filename", "Filesize in Bytes"]
+
+
+def _ignore(*args) -> None:
+    pass
+
+
+def find_log_files(filepath:str, **filters) -> list:
+    """Returns the paths of the message log files of a folder and its subfolders, or the file itself.
+
+    Message logs compressed with gzip, bzip2 or xz and zip archives (whose
+    *_message.log members are read) are included. The keyword arguments are
+    the filters of discover_log_files.
+
+    Raises:
+        FileNotFoundError: If filepath is neither a file nor a folder.
+    """
+    return [log_file.path for log_file in discover_log_files(filepath, **filters)]
+
+
+class LogExtractionJob:
+    """Extracts time, job number, profile name, filename and filesize of all
+    processed files from Lobster message logs and writes them to a CSV file.
+
+    The job does not depend on Qt. The GUI worker and the command line
+    interface pass callbacks for output messages, status text, progress
+    percentage, structured progress reports and cancellation. Progress is
+    reported at most 10 times per second however fast the logs are parsed,
+    as a ProgressReporter dict (bytes, lines, matches, rate, ETA) to
+    on_progress_info and derived from it as percentage and status text.
+
+    Extraction runs as a pipeline of stages connected by bounded queues, so
+    reading, parsing and writing overlap instead of taking turns: a reader
+    thread reads large blocks of complete lines ahead, the blocks are parsed
+    into row batches (in worker processes with workers > 1, the blocks of all
+    files as one stream) and a writer thread writes every batch with
+    writerows.
+
+    The CSV file is written through a CsvSink with a write buffer of
+    write_buffer_size bytes. With fsync its data is forced to disk at the
+    end of the run, with checkpoint_rows also every time that many rows have
+    been written. Incremental runs always fsync before the scan index is
+    saved, so the index never points past rows lost in a crash.
+
+    In incremental mode the job remembers in a ScanIndex how far every log
+    file has been processed. The next run only parses the bytes added since
+    then and new files, and appends their rows to the existing CSV file. A
+    log compressed by rotation (e.g. a_message.log to a_message.log.gz)
+    continues after the data already extracted from it under its old name.
+
+    With parquet_output the rows are also written to a typed Parquet dataset
+    next to the CSV file (see ParquetSink), which the statistics read instead
+    of parsing the CSV.
+
+    With summary_output the statistics window's figures are accumulated while
+    the rows are written (see RunSummary) and saved as a summary file next to
+    the CSV file, so the statistics open without reading the CSV again. The
+    unique filenames and job numbers are counted exactly unless
+    approximate_distinct is set, then they are HyperLogLog estimates.
+    """
+
+    def __init__(self, filepath:str, output_file_csv:str, workers:int=1,
+                 on_output=None, on_status=None, on_progress=None, on_progress_info=None, is_cancelled=None,
+                 incremental:bool=False, scan_index:ScanIndex=None, parquet_output:bool=False,
+                 summary_output:bool=True, approximate_distinct:bool=False, write_buffer_size:int=DEFAULT_CSV_BUFFER_SIZE,
+                 fsync:bool=False, checkpoint_rows:int=0, instrumentation:RunInstrumentation=None):
+        self.filepath = filepath
+        self.output_file_csv = output_file_csv
+        self.workers = workers
+        self.incremental = incremental
+        self.scan_index = scan_index
+        self.parquet_output = parquet_output
+        self.summary_output = summary_output
+        self.approximate_distinct = approximate_distinct
+        self.write_buffer_size = write_buffer_size
+        self.fsync = fsync
+        self.checkpoint_rows = checkpoint_rows
+        self.on_output = on_output or _ignore
+        self.on_status = on_status or _ignore
+        self.on_progress = on_progress or _ignore
+        self.on_progress_info = on_progress_info or _ignore
+        # Stage timings and per file throughput, reported by the caller
+        self.instrumentation = instrumentation or RunInstrumentation()
+        self.progress = None
+        self.is_cancelled = is_cancelled or (lambda: False)
+        self.line_extractor = LogLineExtractor()
+        self.total_files = 0
+        self.total_matches = 0
+        self.end_offsets = {}  # Offset after the last processed line per log file
+        self.rotated_offsets = {}  # Decompressed bytes already extracted per rotated log file
+
+    def run(self, files:list=None) -> int:
+        """Processes all log files and returns the number of extracted rows.
+
+        Args:
+            files: The log files to process as paths or LogFile entries of
+                discover_log_files, found in the job's filepath if omitted.
+
+        Raises:
+            FileNotFoundError: If the log file or folder does not exist.
+        """
+        if files is None:
+            files = discover_log_files(self.filepath)
+        # Sizes from the folder listing save a request per file on network shares
+        known_sizes = {file.path: file.size for file in files if isinstance(file, LogFile)}
+        files = [file.path if isinstance(file, LogFile) else file for file in files]
+        self.total_files = len(files)
+        self.total_matches = 0
+        self.end_offsets = {}
+        self.rotated_offsets = {}
+
+        append = False
+        start_offsets = [0] * len(files)
+        if self.incremental:
+            if self.scan_index is None:
+                self.scan_index = ScanIndex()
+            append = os.path.isfile(self.output_file_csv) and os.path.getsize(self.output_file_csv) > 0
+            if append:
+                start_offsets = [self.scan_index.start_offset(self.output_file_csv, file) for file in files]
+            else:
+                self.scan_index.reset(self.output_file_csv)
+
+            for index, file in enumerate(files):
+                # Members added to a zip archive cannot be told apart from the ones already extracted
+                file_size = os.path.getsize(file)
+                if compression_suffix(file) == ZIP_SUFFIX and 0 < start_offsets[index] < file_size:
+                    self.on_output(
+                        f"Skipping changed archive {os.path.basename(file)}, it was extracted before. "
+                        "Run a full scan to read it again."
+                    )
+                    start_offsets[index] = file_size
+                elif append and start_offsets[index] == 0:
+                    rotated_offset = self.scan_index.rotated_offset(self.output_file_csv, file)
+                    if rotated_offset:
+                        self.on_output(
+                            f"{os.path.basename(file)} is a rotated log, skipping the first {rotated_offset} bytes "
+                            "extracted before it was compressed."
+                        )
+                        self.rotated_offsets[file] = rotated_offset
+
+        bytes_total = sum(
+            max((known_sizes[file] if file in known_sizes else os.path.getsize(file)) - start_offset, 0)
+            for file, start_offset in zip(files, start_offsets)
+        )
+        self.progress = ProgressReporter(self.report_progress, bytes_total, len(files))
+
+        run_summary = None
+        previous_summary = None
+        if self.summary_output:
+            run_summary = RunSummary(approximate_distinct=self.approximate_distinct)
+            if append:
+                # Without the summary of the existing rows the appended rows alone would be misleading
+                previous_summary = load_run_summary(self.output_file_csv)
+                if previous_summary is None:
+                    run_summary = None
+
+        parquet_sink = None
+        if self.parquet_output:
+            # Only a sidecar that holds all rows of the CSV can be appended to, a missing or stale
+            # one would end up with the new rows only and still look fresh afterwards
+            rebuild_parquet = append and fresh_parquet_sidecar(self.output_file_csv) is None
+            parquet_sink = ParquetSink(parquet_sidecar_path(self.output_file_csv), append=append and not rebuild_parquet)
+            self.on_output(f"Writing Parquet output to: {parquet_sidecar_path(self.output_file_csv)}")
+            if rebuild_parquet:
+                self.on_output(
+                    "Warning: the Parquet output is missing or older than the CSV file, rebuilding it from the CSV file..."
+                )
+                with self.instrumentation.stage("write"):
+                    parquet_sink.write_csv(self.output_file_csv)
+
+        csv_sink = None
+        try:
+            csv_sink = CsvSink(
+                self.output_file_csv,
+                header=CSV_HEADER,
+                append=append,
+                buffer_size=self.write_buffer_size,
+                fsync=self.fsync or self.incremental,
+                checkpoint_rows=self.checkpoint_rows,
+            )
+
+            def write_batch(rows:list) -> None:
+                with self.instrumentation.stage("write"):
+                    csv_sink.write_rows(rows)
+                    if parquet_sink:
+                        parquet_sink.write_rows(rows)
+
+            if min(self.workers, default_worker_count()) > 1:
+                batches = self.process_files_parallel(files, start_offsets)
+            else:
+                batches = self.process_files(files, start_offsets)
+
+            batch_writer = BackgroundWriter(write_batch)
+            try:
+                for rows in batches:
+                    if not rows:
+                        continue
+                    # Time the parser waits because the writer is behind
+                    with self.instrumentation.stage("write wait"):
+                        batch_writer.put(rows)
+                    if run_summary:
+                        with self.instrumentation.stage("summary"):
+                            run_summary.add_rows(rows)
+                    self.total_matches += len(rows)
+            finally:
+                with self.instrumentation.stage("write wait"):
+                    batch_writer.close()
+        finally:
+            with self.instrumentation.stage("finalize"):
+                if csv_sink:
+                    csv_sink.close()
+                # Closed after the CSV, a sidecar older than its CSV is considered stale
+                if parquet_sink:
+                    parquet_sink.close()
+
+        if run_summary:
+            with self.instrumentation.stage("finalize"):
+                if previous_summary:
+                    previous_summary.merge(run_summary)
+                    run_summary = previous_summary
+                run_summary.save(self.output_file_csv)
+
+        self.progress.finish()
+
+        if self.incremental:
+            for file, end_offset in self.end_offsets.items():
+                self.scan_index.update(self.output_file_csv, file, end_offset)
+            self.scan_index.save_index()
+
+        return self.total_matches
+
+    def report_progress(self, info:dict) -> None:
+        with self.instrumentation.stage("progress"):
+            self.on_progress(int(info["percent"]))
+            self.on_status(format_progress(info))
+            self.on_progress_info(info)
+
+    def process_files(self, files:list, start_offsets:list):
+        """Yields the row batches of the files one file after the other."""
+        for idx, (file, start_offset) in enumerate(zip(files, start_offsets), start=1):
+            if self.is_cancelled():
+                break
+            yield from self.process_file(file, idx, len(files), start_offset)
+
+    def parse_blocks(self, blocks):
+        extract_lines = self.line_extractor.extract_lines
+        add_time = self.instrumentation.add_time
+        perf_counter = time.perf_counter
+        for data, end_offset in blocks:
+            start_time = perf_counter()
+            lines = split_block(data)
+            rows = extract_lines(lines)
+            add_time("parse", perf_counter() - start_time)
+            yield rows, len(lines), end_offset
+
+    def skip_file(self, filepath:str, total_bytes:int, start_offset:int) -> bool:
+        """Whether a file has nothing to process, counted as done if so."""
+        if total_bytes == 0:
+            self.on_output(f"Skipping empty file: {filepath}")
+        elif start_offset >= total_bytes:
+            self.on_output(f"Skipping unchanged file: {os.path.basename(filepath)}")
+        else:
+            return False
+        self.progress.advance(files_done=1)
+        return True
+
+    def announce_file(self, filepath:str, total_bytes:int, start_offset:int) -> None:
+        filename = os.path.basename(filepath)
+        if start_offset:
+            self.on_output(
+                f"Processing {filename}... (New data: {total_bytes - start_offset} of {total_bytes} bytes)"
+            )
+        else:
+            size_label = "Compressed size" if compression_suffix(filepath) else "Filesize"
+            self.on_output(f"Processing {filename}... ({size_label}: {total_bytes} bytes)")
+
+    def iter_file_blocks(self, filepath:str, start_offset:int):
+        # An incremental scan stops at the last complete line, the rest may still be written
+        return iter_log_blocks(
+            filepath, start_offset, include_partial=not self.incremental, member_suffix=LOG_FILE_SUFFIX,
+            skip_bytes=self.rotated_offsets.get(filepath, 0),
+        )
+
+    def process_file(self, filepath:str, file_index:int, total_files:int, start_offset:int=0):
+        if self.is_cancelled():
+            return
+
+        total_bytes = os.path.getsize(filepath)
+        if self.skip_file(filepath, total_bytes, start_offset):
+            return
+        self.announce_file(filepath, total_bytes, start_offset)
+
+        # The file is read once in binary blocks, progress is based on the bytes consumed
+        # (compressed bytes for archives, they are decompressed as a stream)
+        compressed = bool(compression_suffix(filepath))
+        total_lines = 0
+        file_matches = 0
+        previous_offset = start_offset
+        file_start_time = time.perf_counter()
+        source_blocks = self.iter_file_blocks(filepath, start_offset)
+        with closing(source_blocks):
+            # Reader stage, closed before the file
+            blocks = prefetch(self.instrumentation.timed(source_blocks, "read"))
+            with closing(blocks):
+                for rows, line_count, offset in self.parse_blocks(blocks):
+                    if self.is_cancelled():
+                        break
+                    total_lines += line_count
+                    file_matches += len(rows)
+                    # A compressed file can only be continued after it was read completely
+                    if not compressed or offset >= total_bytes:
+                        self.end_offsets[filepath] = offset
+
+                    # Counted after every block, reported at most 10 times per second
+                    self.progress.advance(bytes_done=offset - previous_offset, lines=line_count, matches=len(rows))
+                    previous_offset = offset
+                    yield rows
+
+        self.progress.advance(files_done=1)
+        self.instrumentation.add_file(
+            filepath, previous_offset - start_offset, total_lines, file_matches, time.perf_counter() - file_start_time
+        )
+        self.on_output(f">>> Finished processing log file. ({total_lines} lines)")
+
+    def process_files_parallel(self, files:list, start_offsets:list):
+        """Yields the row batches of the files in file order, their blocks parsed in worker processes.
+
+        The blocks of all files are read one after the other into a single
+        stream for a ParallelBlockParser, so small files keep every worker
+        busy and at most two blocks per worker are held at any time, however
+        large a file is.
+        """
+        workers = min(self.workers, default_worker_count())
+        self.on_output(f"Processing {len(files)} log files with {workers} worker processes...")
+
+        active_files = []
+        for file, start_offset in zip(files, start_offsets):
+            total_bytes = os.path.getsize(file)
+            if not self.skip_file(file, total_bytes, start_offset):
+                active_files.append((file, start_offset, total_bytes))
+
+        def file_blocks():
+            for position, (file, start_offset, _) in enumerate(active_files):
+                source_blocks = self.iter_file_blocks(file, start_offset)
+                with closing(source_blocks):
+                    for data, offset in source_blocks:
+                        yield data, (position, offset)
+
+        # [position, offset, lines, matches, start time] of the file whose rows come in
+        current = None
+
+        def finish_file() -> None:
+            position, offset, lines, matches, start_time = current
+            file, start_offset, _ = active_files[position]
+            self.progress.advance(files_done=1)
+            self.instrumentation.add_file(file, offset - start_offset, lines, matches, time.perf_counter() - start_time)
+            self.on_output(f"Finished processing {os.path.basename(file)} ({lines} lines)")
+
+        def start_file(position:int) -> list:
+            file, start_offset, total_bytes = active_files[position]
+            self.announce_file(file, total_bytes, start_offset)
+            return [position, start_offset, 0, 0, time.perf_counter()]
+
+        def advance_to(position:int) -> None:
+            nonlocal current
+            next_position = 0
+            if current is not None:
+                finish_file()
+                next_position = current[0] + 1
+            # Files without a complete line yield no block, they are done as well
+            for empty_position in range(next_position, position):
+                current = start_file(empty_position)
+                finish_file()
+            current = start_file(position) if position < len(active_files) else None
+
+        source_blocks = file_blocks()
+        with ParallelBlockParser(workers) as block_parser, closing(source_blocks):
+            # Reader stage, closed before the files
+            blocks = prefetch(self.instrumentation.timed(source_blocks, "read"))
+            with closing(blocks):
+                # Time spent waiting for the worker processes
+                parsed_blocks = self.instrumentation.timed(block_parser.parse(blocks, self.is_cancelled), "parse")
+                for rows, line_count, (position, offset) in parsed_blocks:
+                    if self.is_cancelled():
+                        break
+                    if current is None or current[0] != position:
+                        advance_to(position)
+                    file, _, total_bytes = active_files[position]
+                    # A compressed file can only be continued after it was read completely
+                    if not compression_suffix(file) or offset >= total_bytes:
+                        self.end_offsets[file] = offset
+                    self.progress.advance(bytes_done=offset - current[1], lines=line_count, matches=len(rows))
+                    current[1] = offset
+                    current[2] += line_count
+                    current[3] += len(rows)
+                    yield rows
+
+        if not self.is_cancelled():
+            advance_to(len(active_files))
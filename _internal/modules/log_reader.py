@@ -0,0 +1,51 @@
+# Bytes read from disk per block, large blocks keep syscalls and decoder calls rare
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def read_byte_blocks(log_file, chunk_size:int=DEFAULT_CHUNK_SIZE, include_partial:bool=True, delimiter:bytes=b"\n"):
+    """Reads a binary file in blocks of complete lines.
+
+    Blocks are cut after their last newline (or delimiter) and the incomplete
+    tail is carried over to the next block, so a line is never split and
+    every reported offset is the exact end of a complete line. Reading starts
+    at the current position of log_file.
+
+    Args:
+        log_file: A file object opened in binary mode.
+        chunk_size: Number of bytes to read per block.
+        include_partial: Whether a last line without a newline is yielded. Incremental
+            scans leave it out, the line may still be written to.
+        delimiter: Bytes ending a line, e.g. a custom record delimiter.
+
+    Yields:
+        A tuple of the block's bytes and the file offset right after its last line.
+    """
+    offset = log_file.tell()
+    remainder = b""
+    while True:
+        chunk = log_file.read(chunk_size)
+        if not chunk:
+            break
+        data = remainder + chunk if remainder else chunk
+        cut = data.rfind(delimiter)
+        if cut == -1:
+            remainder = data
+            continue
+        cut += len(delimiter)
+        remainder = data[cut:]
+        offset += cut
+        yield data[:cut], offset
+
+    if remainder and include_partial:
+        yield remainder, offset + len(remainder)
+
+
+def split_block(data:bytes, encoding:str="utf-8") -> list:
+    """Decodes a block of read_byte_blocks into its lines, invalid bytes are ignored
+    like opening the file with errors="ignore". Newlines must be single "\\n" bytes
+    in the encoding."""
+    lines = data.decode(encoding, errors="ignore").split("\n")
+    if not lines[-1]:
+        lines.pop()  # Empty string after the last newline
+    return lines
+
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+from collections import deque
+
+from _internal.modules.log_extractor import LogLineExtractor
+from _internal.modules.log_reader import split_block
+
+# Seconds to wait for a worker result before checking for cancellation again
+POLL_INTERVAL = 0.2
+
+_extractor = None
+
+
+def parse_block(data:bytes) -> tuple:
+    """Extracts the matching rows of a block of complete lines, in a pool process or locally.
+
+    Returns:
+        A tuple of the list of extracted rows and the number of lines in the block.
+    """
+    global _extractor
+    if _extractor is None:
+        _extractor = LogLineExtractor()
+
+    lines = split_block(data)
+    return _extractor.extract_lines(lines), len(lines)
+
+
+def default_worker_count() -> int:
+    return os.cpu_count() or 1
+
+
+class ParallelBlockParser:
+    """Parses the line blocks of log files in a process pool.
+
+    The parser stage of the extraction with several workers. Blocks are sent
+    to the pool as they are read, at most two per worker are in flight so
+    reading pauses while the workers are busy and memory stays bounded
+    however large a file is. Results come back in block order. Use as a
+    context manager, the pool is kept for all files of a run.
+    """
+
+    def __init__(self, workers:int):
+        self.workers = max(1, min(workers, default_worker_count()))
+        self.max_pending = self.workers * 2
+        self.pool = None
+
+    def __enter__(self) -> "ParallelBlockParser":
+        self.pool = multiprocessing.Pool(processes=self.workers)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = None
+
+    def parse(self, blocks, is_cancelled=None):
+        """Yields (rows, line_count, end_offset) for every (block, end_offset) of blocks in order.
+
+        Args:
+            blocks: Iterable of (bytes, end_offset) tuples, see read_byte_blocks.
+            is_cancelled: Optional callable, parsing stops once it returns True.
+        """
+        pending = deque()
+
+        def next_result():
+            result, end_offset = pending[0]
+            while True:
+                if is_cancelled and is_cancelled():
+                    return None
+                try:
+                    rows, line_count = result.get(timeout=POLL_INTERVAL)
+                    break
+                except multiprocessing.TimeoutError:
+                    continue
+            pending.popleft()
+            return rows, line_count, end_offset
+
+        for data, end_offset in blocks:
+            pending.append((self.pool.apply_async(parse_block, (data,)), end_offset))
+            if len(pending) >= self.max_pending:
+                parsed = next_result()
+                if parsed is None:
+                    return
+                yield parsed
+        while pending:
+            parsed = next_result()
+            if parsed is None:
+                return
+            yield parsed
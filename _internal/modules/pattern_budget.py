@@ -0,0 +1,204 @@
+import multiprocessing
+import os
+import queue
+import time
+
+from _internal.modules.record_matcher import RecordMatcher, write_rows_to_csv
+from _internal.modules.regex_engines import AUTO_ENGINE
+
+# Seconds all patterns together may take on one block of records (up to 16 MB of log)
+DEFAULT_BLOCK_BUDGET = 30
+# Seconds to wait for the search process before checking the budget and cancellation again
+POLL_INTERVAL = 0.2
+
+# Slots of the shared progress array of the search process
+_HEARTBEAT = 0  # time.monotonic() when the last block was done, 0 until the search started
+_BYTES_DONE = 1
+_BLOCKS_DONE = 2
+
+
+class PatternBudgetExceeded(TimeoutError):
+    """Raised when RegEx patterns took longer than their time budget and the search was stopped.
+
+    Attributes:
+        patterns: List of (index, pattern) of the patterns that exceeded the
+            budget on their own, empty if only all patterns together did.
+        budget: The budget in seconds per block for all patterns together.
+    """
+
+    def __init__(self, patterns:list, budget:float):
+        self.patterns = patterns
+        self.budget = budget
+        if patterns:
+            names = ", ".join(f"#{index + 1} {pattern!r}" for index, pattern in patterns)
+            message = f"RegEx pattern {names} alone exceeded the time budget of {budget:g} s per block, the search was stopped."
+        else:
+            message = f"The patterns together exceeded the time budget of {budget:g} s per block, the search was stopped."
+        super().__init__(message)
+
+
+def run_search_with_budget(patterns:list, filepath:str, headers:list, output_csv:str, delimiter:str="\n",
+                           engine:str=AUTO_ENGINE, budget:float=DEFAULT_BLOCK_BUDGET, is_cancelled=None,
+                           on_progress=None) -> int:
+    """Runs RecordMatcher.match_file into a CSV file in a separate process that is killed when it stalls.
+
+    The backtracking ``re`` engine holds the GIL for as long as a single
+    search runs, a catastrophic pattern can neither be timed out nor
+    cancelled in the calling process. Here the search process reports every
+    block of records it finished, if a block takes longer than budget seconds,
+    or the search is cancelled, the process is terminated. The budget covers
+    all patterns together, every record is matched against all of them in
+    turn. When it is exceeded the partial CSV file is removed and the patterns
+    are timed one by one on the stalled block, again in a killable process,
+    to name the ones that exceed the budget on their own.
+
+    Args:
+        patterns: The RegEx patterns.
+        filepath: Path to the (possibly compressed) log file.
+        headers: The CSV header, one column per pattern.
+        output_csv: Path of the CSV file, written by the search process and removed if the budget is exceeded.
+        delimiter: Record delimiter.
+        engine: RegEx engine, see regex_engines.select_engine.
+        budget: Seconds all patterns together may take on one block of records.
+        is_cancelled: Optional callable, the search is stopped once it returns True.
+        on_progress: Optional callable(bytes_done), called whenever blocks were finished.
+
+    Returns:
+        The number of rows written, None if the search was cancelled.
+
+    Raises:
+        PatternBudgetExceeded: If the search exceeded the budget.
+        RuntimeError: If the search failed in or with its process.
+    """
+    progress = multiprocessing.Array("d", 3, lock=False)
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_search_process,
+        args=(patterns, filepath, headers, output_csv, delimiter, engine, progress, results),
+        daemon=True,
+    )
+    process.start()
+    try:
+        bytes_done = 0
+        while True:
+            result = _get_result(results, process)
+            if result is not None:
+                status, value = result
+                if status == "error":
+                    raise RuntimeError(value)
+                return value
+            if is_cancelled and is_cancelled():
+                return None
+            if on_progress and progress[_BYTES_DONE] != bytes_done:
+                bytes_done = progress[_BYTES_DONE]
+                on_progress(int(bytes_done))
+            heartbeat = progress[_HEARTBEAT]
+            if heartbeat and time.monotonic() - heartbeat > budget:
+                stalled_block = int(progress[_BLOCKS_DONE])
+                process.terminate()
+                process.join()
+                # Only the rows before the stalled block were written, the file would look like a complete result
+                if os.path.exists(output_csv):
+                    os.remove(output_csv)
+                slow_patterns = find_slow_patterns(patterns, filepath, stalled_block, delimiter, engine, budget,
+                                                   is_cancelled)
+                raise PatternBudgetExceeded(slow_patterns, budget)
+    finally:
+        process.terminate()
+        process.join()
+
+
+def find_slow_patterns(patterns:list, filepath:str, block_index:int, delimiter:str="\n",
+                       engine:str=AUTO_ENGINE, budget:float=DEFAULT_BLOCK_BUDGET, is_cancelled=None) -> list:
+    """Times every pattern on its own on one block of records of a file, in a killable process.
+
+    A pattern that is still running after budget seconds is stopped, the
+    remaining patterns continue in a new process.
+
+    Returns:
+        A list of (index, pattern) of the patterns that exceeded the budget.
+    """
+    slow_patterns = []
+    remaining = list(enumerate(patterns))
+    while remaining:
+        # Index of the pattern being timed and time.monotonic() when it started, -1 while reading
+        state = multiprocessing.Array("d", [-1, 0], lock=False)
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_time_patterns_process,
+            args=(remaining, filepath, block_index, delimiter, engine, state, results),
+            daemon=True,
+        )
+        process.start()
+        try:
+            while True:
+                result = _get_result(results, process)
+                if result is not None:
+                    if result[0] == "error":
+                        raise RuntimeError(result[1])
+                    return slow_patterns
+                if is_cancelled and is_cancelled():
+                    return slow_patterns
+                if state[0] >= 0 and time.monotonic() - state[1] > budget:
+                    slow_index = int(state[0])
+                    slow_patterns.append((slow_index, patterns[slow_index]))
+                    remaining = [(index, pattern) for index, pattern in remaining if index > slow_index]
+                    break
+        finally:
+            process.terminate()
+            process.join()
+    return slow_patterns
+
+
+def _get_result(results, process):
+    """Waits up to POLL_INTERVAL for the result of a process, None if it is still running."""
+    try:
+        return results.get(timeout=POLL_INTERVAL)
+    except queue.Empty:
+        pass
+    if process.is_alive():
+        return None
+    # The result may have arrived right before the process ended
+    try:
+        return results.get(timeout=POLL_INTERVAL)
+    except queue.Empty:
+        return "error", f"The search process ended unexpectedly (exit code {process.exitcode})."
+
+
+# ====== Process targets ====== #
+
+def _search_process(patterns, filepath, headers, output_csv, delimiter, engine, progress, results) -> None:
+    try:
+        matcher = RecordMatcher(patterns, delimiter, engine=engine)
+
+        def block_done(bytes_done):
+            progress[_BYTES_DONE] = bytes_done
+            progress[_BLOCKS_DONE] += 1
+            progress[_HEARTBEAT] = time.monotonic()
+
+        progress[_HEARTBEAT] = time.monotonic()
+        total_rows = write_rows_to_csv(matcher.match_file(filepath, on_progress=block_done), headers, output_csv)
+        results.put(("done", total_rows))
+    except Exception as ex:
+        results.put(("error", f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}"))
+
+
+def _time_patterns_process(indexed_patterns, filepath, block_index, delimiter, engine, state, results) -> None:
+    try:
+        matchers = [
+            (index, RecordMatcher([pattern], delimiter, engine=engine)) for index, pattern in indexed_patterns
+        ]
+        block = None
+        for index, (data, _) in enumerate(matchers[0][1].iter_blocks(filepath)):
+            if index == block_index:
+                block = data
+                break
+        if block is not None:
+            for index, matcher in matchers:
+                state[1] = time.monotonic()
+                state[0] = index
+                for _ in matcher.match_bytes(block):
+                    pass
+        results.put(("done", None))
+    except Exception as ex:
+        results.put(("error", f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}"))
@@ -0,0 +1,96 @@
+import time
+
+# Maximum number of progress reports per second
+DEFAULT_REPORT_RATE = 10.0
+
+
+def format_bytes(size:float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds:float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def format_progress(info:dict) -> str:
+    """Returns a one line status text of a progress report."""
+    parts = [
+        f"File {info['files_done']}/{info['files_total']}",
+        f"{info['percent']:.0f}%",
+        f"{format_bytes(info['bytes_done'])} of {format_bytes(info['bytes_total'])}",
+        f"{format_bytes(info['rate'])}/s",
+    ]
+    if info["lines"]:
+        parts.append(f"{info['lines']:,} lines")
+    parts.append(f"{info['matches']:,} matches")
+    if info["eta"] is not None:
+        parts.append(f"ETA {format_duration(info['eta'])}")
+    return " - ".join(parts)
+
+
+class ProgressReporter:
+    """Collects progress counters and reports them at a bounded rate.
+
+    The counters are advanced as often as convenient, e.g. after every block.
+    callback receives a progress report dict at most max_rate times per second,
+    intermediate advances are coalesced into the next report. A report holds
+    bytes_done, bytes_total, lines, matches, files_done, files_total, elapsed
+    seconds, percent, rate in bytes per second and eta in seconds (None while
+    unknown).
+    """
+
+    def __init__(self, callback, bytes_total:int=0, files_total:int=0,
+                 max_rate:float=DEFAULT_REPORT_RATE, clock=time.monotonic):
+        self.callback = callback
+        self.bytes_total = bytes_total
+        self.files_total = files_total
+        self.interval = 1 / max_rate
+        self.clock = clock
+        self.start_time = clock()
+        self.last_report = None
+        self.bytes_done = 0
+        self.lines = 0
+        self.matches = 0
+        self.files_done = 0
+
+    def advance(self, bytes_done:int=0, lines:int=0, matches:int=0, files_done:int=0) -> None:
+        """Adds to the counters and reports them if the last report is old enough."""
+        self.bytes_done += bytes_done
+        self.lines += lines
+        self.matches += matches
+        self.files_done += files_done
+        now = self.clock()
+        if self.last_report is None or now - self.last_report >= self.interval:
+            self.report(now)
+
+    def finish(self) -> None:
+        """Reports the final counters regardless of the rate."""
+        self.report(self.clock())
+
+    def report(self, now:float) -> None:
+        self.last_report = now
+        self.callback(self.snapshot(now))
+
+    def snapshot(self, now:float=None) -> dict:
+        now = self.clock() if now is None else now
+        elapsed = now - self.start_time
+        rate = self.bytes_done / elapsed if elapsed > 0 else 0.0
+        bytes_left = max(self.bytes_total - self.bytes_done, 0)
+        percent = min(self.bytes_done * 100 / self.bytes_total, 100.0) if self.bytes_total else 100.0
+        return {
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "lines": self.lines,
+            "matches": self.matches,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "elapsed": elapsed,
+            "percent": percent,
+            "rate": rate,
+            "eta": bytes_left / rate if rate > 0 else None,
+        }
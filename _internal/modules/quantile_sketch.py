@@ -0,0 +1,121 @@
+import math
+
+# Relative error of every quantile estimate
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Bucket limit, the lowest buckets are combined beyond it
+DEFAULT_MAX_BUCKETS = 2048
+REPORTED_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def quantile_label(quantile:float) -> str:
+    """Returns the percentile name of a quantile, e.g. "P99.9" for 0.999."""
+    return f"P{quantile * 100:g}"
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a bounded relative error (DDSketch).
+
+    Positive values are counted in logarithmic buckets whose bounds grow by
+    the factor gamma = (1 + accuracy) / (1 - accuracy), so every quantile is
+    estimated within the relative accuracy of its true value. File sizes from
+    one byte to a terabyte need less than 1,500 buckets at 1% accuracy.
+    Sketches with the same accuracy are merged by adding their bucket counts,
+    so sketches of files, worker processes or runs combine exactly as if all
+    values had been added to one sketch.
+    """
+
+    def __init__(self, relative_accuracy:float=DEFAULT_RELATIVE_ACCURACY, max_buckets:int=DEFAULT_MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # Bucket index -> count of values in (gamma ** (index - 1), gamma ** index]
+        self.zero_count = 0  # Values <= 0
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value:float) -> None:
+        self.count += 1
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self.collapse()
+
+    def collapse(self) -> None:
+        """Combines the lowest buckets so at most max_buckets remain, the high quantiles stay accurate."""
+        indexes = sorted(self.buckets)
+        excess = len(indexes) - self.max_buckets
+        if excess <= 0:
+            return
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self.buckets[target] += self.buckets.pop(index)
+
+    def merge(self, other:"QuantileSketch") -> None:
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        if not other.count:
+            return
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self.collapse()
+
+    def quantile(self, quantile:float) -> float:
+        """Returns the estimated value at quantile (0 to 1), None for an empty sketch."""
+        if not self.count:
+            return None
+        if quantile <= 0:
+            return self.minimum
+        if quantile >= 1:
+            return self.maximum
+
+        rank = quantile * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.minimum, 0)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket in relative terms, within the accuracy of every value in it
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def quantiles(self, quantiles:tuple=REPORTED_QUANTILES) -> dict:
+        """Returns {percentile label: estimated value}, e.g. {"P50": ..., "P99.9": ...}."""
+        return {quantile_label(quantile): self.quantile(quantile) for quantile in quantiles}
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+        }
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.minimum = data["minimum"]
+        sketch.maximum = data["maximum"]
+        return sketch
@@ -0,0 +1,284 @@
+import codecs
+import csv
+import locale
+import re
+import time
+
+from _internal.modules.chunked_search import iter_mapped_blocks
+from _internal.modules.compressed_input import is_compressed, iter_log_blocks
+from _internal.modules.literal_prefilter import delimiter_can_overlap, iter_candidate_records, longest_required_literal
+from _internal.modules.regex_engines import AUTO_ENGINE, available_engines, compile_pattern, matches_alike_as_bytes
+
+# Records are only looked up around the literals if at most one in this many records contains one,
+# splitting every record is faster when the literals are common
+SPARSE_LITERAL_RATIO = 8
+# Bytes of a log the regex engines are compared on by default
+ENGINE_BENCHMARK_BYTES = 64 * 1024 * 1024
+
+
+def _ascii_transparent(encoding:str) -> bool:
+    """Whether every byte below 0x80 of text in encoding is an ASCII character, never part of another one."""
+    name = codecs.lookup(encoding).name
+    return name in ("utf-8", "ascii", "latin-1") or name.startswith(("iso8859-", "cp125"))
+
+
+class RecordMatcher:
+    """Matches all RegEx patterns against one record (by default one log line) at a time.
+
+    Every record that matches at least one pattern becomes one CSV row with
+    a cell per pattern, patterns without a match in that record leave their
+    cell empty. This keeps all values of a row from the same record, which
+    is not guaranteed when every pattern runs over the whole text on its own.
+
+    A cell holds the first match of the pattern in the record: its group if
+    the pattern has one group, the whole match if it has none, and all
+    groups joined by a space if it has several.
+
+    Most patterns contain text every match must include, e.g. "length=" in
+    r"length=(\d+)". The longest such literal of every pattern is derived from
+    the parsed pattern and looked up with str.find/bytes.find first: a pattern
+    only runs on records that contain its literal, and if every pattern has a
+    literal and the literals are rare, only the records around them are split
+    off at all. Patterns without a literal are run on every record, as before,
+    and so are patterns compiled with the "regex" package, whose syntax the
+    literals cannot be derived from.
+
+    Every pattern is compiled with the regex engine chosen by
+    regex_engines.select_engine, engine="auto" keeps ``re`` unless a pattern
+    is better served by RE2 or needs the "regex" package. self.engines holds
+    the engine of every pattern.
+
+    Files are matched as bytes, without decoding them, only if every pattern
+    matches the encoded text like the text (see
+    regex_engines.matches_alike_as_bytes), e.g. r"length=([0-9]+)". Blocks
+    are decoded and matched like match_text otherwise, so \\w, \\d, \\s
+    and "." find the same non-ASCII characters as in the in-memory search.
+    """
+
+    def __init__(self, patterns:list, delimiter:str="\n", encoding:str=None, engine:str=AUTO_ENGINE):
+        # Same default as open() in text mode, so the text and the file mode decode alike
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.patterns = patterns
+        self.delimiter = delimiter or "\n"
+        self.engine = engine
+        compiled = [compile_pattern(pattern, engine) for pattern in patterns]
+        self._searches = [regex.search for regex, _ in compiled]
+        self.engines = [name for _, name in compiled]
+        self.literals = [longest_required_literal(pattern, name) for pattern, name in zip(patterns, self.engines)]
+        self._guarded_searches = list(zip(self._searches, self.literals))
+        self.match_as_bytes = _ascii_transparent(self.encoding) and all(
+            name in ("re", "re2") and matches_alike_as_bytes(pattern) for pattern, name in zip(patterns, self.engines)
+        )
+        self._bytes_searches = None
+        self._bytes_literals = None
+        self._guarded_bytes_searches = None
+
+    def match_record(self, record) -> list:
+        """Returns the row for a single record, or None if no pattern matched.
+
+        Args:
+            record: The record as str, or as bytes in the encoding of the matcher.
+        """
+        if isinstance(record, bytes):
+            guarded_searches = self._guarded_bytes_searches or self._get_guarded_bytes_searches()
+        else:
+            guarded_searches = self._guarded_searches
+
+        row = []
+        found = False
+        for search, literal in guarded_searches:
+            # A record without the pattern's literal cannot match, the regex is skipped
+            match = search(record) if literal is None or literal in record else None
+            if match is None:
+                row.append("")
+            else:
+                row.append(self._cell_value(match))
+                found = True
+        return row if found else None
+
+    def match_text(self, text:str):
+        """Yields the rows of all records of a text."""
+        match_record = self.match_record
+        for record in self._iter_records(text, self.delimiter, self.literals):
+            row = match_record(record)
+            if row is not None:
+                yield row
+
+    def _iter_records(self, text, delimiter, literals:list):
+        """Yields the records of text that can match, all records if a pattern has no literal."""
+        if None not in literals and not delimiter_can_overlap(delimiter):
+            hits = sum(text.count(literal) for literal in literals)
+            if hits * SPARSE_LITERAL_RATIO <= text.count(delimiter):
+                yield from iter_candidate_records(text, delimiter, literals)
+                return
+        records = text.split(delimiter)
+        if text.endswith(delimiter):
+            records.pop()
+        yield from records
+
+    def match_file(self, filepath:str, is_cancelled=None, on_progress=None):
+        """Yields the rows of all records of a file without loading it into memory.
+
+        The file is memory-mapped and split into records block by block, see
+        match_bytes for how a block is matched.
+        Files compressed with gzip, bzip2 or xz and the members of zip
+        archives are decompressed as a stream instead.
+
+        Args:
+            filepath: Path to the file.
+            is_cancelled: Optional callable, matching stops once it returns True.
+            on_progress: Optional callable(bytes_done), called after every block. Compressed
+                files report the compressed bytes read.
+        """
+        for block, bytes_done in self.iter_blocks(filepath, is_cancelled):
+            if is_cancelled and is_cancelled():
+                return
+            yield from self.match_bytes(block)
+            if on_progress:
+                on_progress(bytes_done)
+
+    def iter_blocks(self, filepath:str, is_cancelled=None):
+        """Yields the (bytes, bytes_done) blocks of complete records match_file matches, in the same order."""
+        delimiter = self.delimiter.encode(self.encoding)
+        if is_compressed(filepath):
+            return iter_log_blocks(filepath, delimiter=delimiter)
+        return iter_mapped_blocks(filepath, delimiter, is_cancelled=is_cancelled)
+
+    def match_bytes(self, data:bytes):
+        """Yields the rows of all records of a block of bytes in the encoding of the matcher.
+
+        With match_as_bytes the records are matched as bytes and only matched
+        values get decoded, otherwise the block is decoded and matched as text.
+        """
+        if not self.match_as_bytes:
+            # Text mode turns "\r\n" into "\n", the records must look the same here
+            yield from self.match_text(data.decode(self.encoding, errors="replace").replace("\r\n", "\n"))
+            return
+        delimiter = self.delimiter.encode(self.encoding)
+        match_record = self.match_record
+        self._get_guarded_bytes_searches()
+        # Text mode turns "\r\n" into "\n", the records must look the same here
+        data = data.replace(b"\r\n", b"\n")
+        for record in self._iter_records(data, delimiter, self._bytes_literals):
+            row = match_record(record)
+            if row is not None:
+                yield row
+
+    def _get_guarded_bytes_searches(self) -> list:
+        """Returns (search, literal) pairs of the patterns compiled as bytes patterns."""
+        if self._bytes_searches is None:
+            compiled = [compile_pattern(pattern.encode(self.encoding), self.engine) for pattern in self.patterns]
+            self._bytes_searches = [regex.search for regex, _ in compiled]
+            # Derived from the bytes patterns, an escape like \xe9 means one byte there
+            self._bytes_literals = [
+                longest_required_literal(pattern.encode(self.encoding), name)
+                for pattern, (_, name) in zip(self.patterns, compiled)
+            ]
+            self._guarded_bytes_searches = list(zip(self._bytes_searches, self._bytes_literals))
+        return self._guarded_bytes_searches
+
+    def _cell_value(self, match:re.Match) -> str:
+        group_count = match.re.groups
+        if group_count == 0:
+            values = [match.group(0)]
+        else:
+            values = [value for value in match.groups() if value is not None]
+        if values and isinstance(values[0], bytes):
+            values = [value.decode(self.encoding, errors="replace") for value in values]
+        return " ".join(values)
+
+
+def benchmark_engines(patterns:list, filepath:str, delimiter:str="\n", engines:list=None,
+                      max_bytes:int=ENGINE_BENCHMARK_BYTES, encoding:str=None) -> list:
+    """Times RecordMatcher with every regex engine on the start of a log file.
+
+    The first max_bytes of the file (complete records, compressed files are
+    decompressed) are read once and matched with each engine, so only the
+    matching is timed. The rows of every engine are compared with those of
+    ``re``, an engine may differ on non-ASCII text (RE2 matches \d, \w and
+    \s against ASCII only).
+
+    Args:
+        patterns: The RegEx patterns.
+        filepath: Path to the (possibly compressed) log file.
+        delimiter: Record delimiter.
+        engines: Names of the engines to compare, all installed engines and "auto" if omitted.
+        max_bytes: Number of bytes of the file to match.
+        encoding: Encoding of the file, see RecordMatcher.
+
+    Returns:
+        A list with a dict per engine: "engine", "engines" (per pattern),
+        "seconds", "bytes", "mb_per_s", "rows", "same_rows" and "error",
+        which holds the message if the engine could not compile a pattern.
+    """
+    encoding = encoding or locale.getpreferredencoding(False)
+    blocks = []
+    sample_bytes = 0
+    for block, _ in iter_log_blocks(filepath, delimiter=(delimiter or "\n").encode(encoding)):
+        blocks.append(block)
+        sample_bytes += len(block)
+        if sample_bytes >= max_bytes:
+            break
+    sample = b"".join(blocks)
+
+    reference_rows = None
+    results = []
+    for engine in engines or [*available_engines(), AUTO_ENGINE]:
+        result = {"engine": engine, "engines": None, "seconds": None, "bytes": len(sample), "mb_per_s": None,
+                  "rows": None, "same_rows": None, "error": None}
+        results.append(result)
+        try:
+            matcher = RecordMatcher(patterns, delimiter, encoding, engine=engine)
+        except Exception as ex:
+            result["error"] = f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}"
+            continue
+        start_time = time.perf_counter()
+        rows = list(matcher.match_bytes(sample))
+        seconds = time.perf_counter() - start_time
+        if engine == "re":
+            reference_rows = rows
+        result.update({
+            "engines": matcher.engines,
+            "seconds": seconds,
+            "mb_per_s": len(sample) / seconds / 1024 ** 2 if seconds else None,
+            "rows": len(rows),
+            "same_rows": rows == reference_rows if reference_rows is not None else None,
+        })
+    return results
+
+
+def engine_benchmark_lines(results:list) -> list:
+    """Returns the results of benchmark_engines as lines of text, one per engine."""
+    lines = []
+    for result in results:
+        if result["error"]:
+            lines.append(f"{result['engine']:<6} failed: {result['error']}")
+            continue
+        same_rows = {True: "same rows as re", False: "rows DIFFER from re", None: ""}[result["same_rows"]]
+        lines.append(
+            f"{result['engine']:<6} {result['seconds']:8.3f} s  {result['mb_per_s']:8.1f} MB/s  "
+            f"{result['rows']:>10,} rows  {same_rows}"
+            + (f"  (per pattern: {', '.join(result['engines'])})" if result["engine"] == AUTO_ENGINE else "")
+        )
+    return lines
+
+
+def write_rows_to_csv(rows, headers:list, output_csv:str, is_cancelled=None) -> int:
+    """Writes the header and all rows to a CSV file and returns the number of rows written.
+
+    Args:
+        rows: Iterable of rows, e.g. from RecordMatcher.match_text or match_file.
+        headers: The CSV header, one column per pattern.
+        output_csv: Path of the CSV file.
+        is_cancelled: Optional callable, writing stops once it returns True.
+    """
+    total_rows = 0
+    with open(output_csv, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        for row in rows:
+            if is_cancelled and is_cancelled():
+                break
+            writer.writerow(row)
+            total_rows += 1
+    return total_rows
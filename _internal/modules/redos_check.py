@@ -0,0 +1,323 @@
+import re
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+EXPONENTIAL = "exponential"
+POLYNOMIAL = "polynomial"
+# Counted repeats with a higher maximum are treated like unbounded ones, e.g. "(a{1,500})+"
+LARGE_REPEAT = 100
+
+# Characters are compared on Latin-1, everything above is one pseudo character
+_OTHER = 256
+_ALL = frozenset(range(257))
+_REPEATS = tuple(
+    getattr(sre_constants, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+_POSSESSIVE_REPEAT = getattr(sre_constants, "POSSESSIVE_REPEAT", None)  # Python 3.11+
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+_ZERO_WIDTH = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+
+
+def _category_set(predicate) -> frozenset:
+    return frozenset(code for code in range(256) if predicate(chr(code))) | {_OTHER}
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: _category_set(str.isdecimal),
+    sre_constants.CATEGORY_SPACE: _category_set(str.isspace),
+    sre_constants.CATEGORY_WORD: _category_set(lambda char: char.isalnum() or char == "_"),
+    sre_constants.CATEGORY_LINEBREAK: frozenset({10}),
+}
+_CATEGORIES.update({
+    sre_constants.CATEGORY_NOT_DIGIT: _ALL - _CATEGORIES[sre_constants.CATEGORY_DIGIT] | {_OTHER},
+    sre_constants.CATEGORY_NOT_SPACE: _ALL - _CATEGORIES[sre_constants.CATEGORY_SPACE] | {_OTHER},
+    sre_constants.CATEGORY_NOT_WORD: _ALL - _CATEGORIES[sre_constants.CATEGORY_WORD] | {_OTHER},
+    sre_constants.CATEGORY_NOT_LINEBREAK: _ALL - {10},
+})
+
+
+class RedosFinding:
+    """A construct of a pattern that can make the backtracking ``re`` engine take super-linear time.
+
+    "exponential" constructs can stall on a single record of a few dozen
+    characters, "polynomial" ones get slow on long records only.
+    """
+
+    __slots__ = ("severity", "construct", "example")
+
+    def __init__(self, severity:str, construct:str, example:str):
+        self.severity = severity
+        self.construct = construct
+        self.example = example
+
+    def __str__(self) -> str:
+        return f"{self.severity.capitalize()} backtracking: {self.construct} (both can match {self.example})"
+
+    def __repr__(self) -> str:
+        return f"RedosFinding({self.severity!r}, {self.construct!r}, {self.example!r})"
+
+
+def find_super_linear(pattern) -> list:
+    """Flags the parts of a RegEx pattern that can backtrack catastrophically.
+
+    A static check on the parsed pattern, it needs no input text:
+
+    - a part of variable length (a repeat, an optional item) inside an
+      unbounded repeat, where nothing mandatory of the outer repeat separates
+      the iterations, e.g. "(a+)+", "(\\w+\\s?)+" or "(\\d{1,3}\\.?)+"
+      (exponential)
+    - an unbounded repeat of alternatives that can start with the same
+      character, e.g. "(\\w\\d|\\d\\w)+" (exponential)
+    - two unbounded repeats in a row that can match the same characters,
+      e.g. "\\d+\\d+" or ".*\\s*" (polynomial)
+
+    Possessive repeats and atomic groups do not backtrack and are skipped.
+    The check is conservative, it can flag a pattern that is only slow on
+    text it never sees, but "(a+)+$"-style patterns are always found.
+
+    Args:
+        pattern: A str or bytes pattern. Patterns ``re`` cannot parse are not checked.
+
+    Returns:
+        A list of RedosFinding, empty if the pattern is safe or not parsable.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    findings = []
+    _check_sequence(list(parsed), findings, ignore_case)
+    # A repeat nested deeper is reached once per enclosing repeat, report every construct once
+    unique = {}
+    for finding in findings:
+        unique.setdefault((finding.severity, finding.construct), finding)
+    return list(unique.values())
+
+
+def has_exponential_backtracking(pattern) -> bool:
+    return any(finding.severity == EXPONENTIAL for finding in find_super_linear(pattern))
+
+
+def _check_sequence(items:list, findings:list, ignore_case:bool) -> None:
+    previous_repeat = None  # Characters of the last unbounded repeat, while only empty-matching items follow it
+    for op, av in _flatten(items):
+        if _is_unbounded_repeat(op, av):
+            body = list(av[2])
+            body_chars = _all_chars(body, ignore_case)
+            if previous_repeat is not None and _overlap(previous_repeat, body_chars):
+                findings.append(RedosFinding(
+                    POLYNOMIAL, "two repeats in a row match the same characters",
+                    _example(_overlap(previous_repeat, body_chars)),
+                ))
+            previous_repeat = body_chars
+            _check_repeat_body(body, findings, ignore_case)
+        elif not _can_be_empty(op, av):
+            previous_repeat = None
+        for sub_items in _sub_sequences(op, av):
+            _check_sequence(sub_items, findings, ignore_case)
+
+
+def _check_repeat_body(body:list, findings:list, ignore_case:bool) -> None:
+    """Checks the body of an unbounded repeat for ways to split the same text across iterations."""
+    mandatory = list(_mandatory_chars(body, ignore_case))
+    for variable_chars in _variable_part_chars(body, ignore_case):
+        # A mandatory character the variable part cannot match fixes where an iteration ends
+        if not any(chars and not _overlap(chars, variable_chars) for chars in mandatory):
+            findings.append(RedosFinding(
+                EXPONENTIAL, "a part of variable length inside a repeat can split the same text in many ways",
+                _example(variable_chars),
+            ))
+    for branches in _top_level_branches(body):
+        first_sets = [_first_chars(branch, ignore_case) for branch in branches]
+        for index, first in enumerate(first_sets):
+            overlap = next((_overlap(first, other) for other in first_sets[index + 1:] if _overlap(first, other)), None)
+            if overlap:
+                findings.append(RedosFinding(
+                    EXPONENTIAL, "alternatives inside a repeat can start with the same character",
+                    _example(overlap),
+                ))
+                break
+
+
+def _overlap(chars:frozenset, other:frozenset) -> frozenset:
+    # Two sets that both contain characters above Latin-1 need not share any of them, e.g. \\w and \\s
+    return (chars & other) - {_OTHER}
+
+
+def _is_unbounded_repeat(op, av) -> bool:
+    return op in _REPEATS and op is not _POSSESSIVE_REPEAT and (
+        av[1] == sre_constants.MAXREPEAT or av[1] >= LARGE_REPEAT
+    )
+
+
+def _flatten(items) -> list:
+    """Returns items with the contents of groups in place of the groups, groups do not change what matches."""
+    flat = []
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            flat.extend(_flatten(av[-1]))
+        else:
+            flat.append((op, av))
+    return flat
+
+
+def _sub_sequences(op, av) -> list:
+    """Returns the item lists nested in an item, atomic and possessive parts never backtrack into."""
+    if op is sre_constants.SUBPATTERN:
+        return [list(av[-1])]
+    if op is sre_constants.BRANCH:
+        return [list(branch) for branch in av[1]]
+    if op in _REPEATS and op is not _POSSESSIVE_REPEAT:
+        return [list(av[2])]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [list(av[1])]
+    if op is sre_constants.GROUPREF_EXISTS:
+        return [list(branch) for branch in av[1:] if branch]
+    return []
+
+
+def _variable_part_chars(items:list, ignore_case:bool):
+    """Yields the characters of every part of items that can match a varying number of characters:
+    repeats with a range like "+", "*", "?" or "{1,3}", and alternations with an empty alternative."""
+    for op, av in items:
+        if op in _REPEATS and op is not _POSSESSIVE_REPEAT and av[0] != av[1]:
+            yield _all_chars(list(av[2]), ignore_case)
+        elif op is sre_constants.BRANCH and any(_sequence_can_be_empty(branch) for branch in av[1]):
+            yield _all_chars([(op, av)], ignore_case)
+        for sub_items in _sub_sequences(op, av):
+            yield from _variable_part_chars(sub_items, ignore_case)
+
+
+def _mandatory_chars(items:list, ignore_case:bool):
+    """Yields the characters of every single character item each match of items goes through."""
+    for op, av in items:
+        chars = _char_set(op, av, ignore_case)
+        if chars is not None:
+            yield chars
+        elif op is sre_constants.SUBPATTERN:
+            yield from _mandatory_chars(list(av[-1]), ignore_case)
+        elif op in _REPEATS and av[0] >= 1:
+            yield from _mandatory_chars(list(av[2]), ignore_case)
+
+
+def _top_level_branches(items:list):
+    """Yields the alternatives of every alternation reached without entering another repeat."""
+    for op, av in items:
+        if op is sre_constants.BRANCH:
+            yield [list(branch) for branch in av[1]]
+        elif op is sre_constants.SUBPATTERN:
+            yield from _top_level_branches(list(av[-1]))
+
+
+def _char_set(op, av, ignore_case:bool) -> frozenset:
+    """Returns the characters a single character item matches, None for other items."""
+    if op is sre_constants.LITERAL:
+        chars = frozenset({av if av < 256 else _OTHER})
+    elif op is sre_constants.NOT_LITERAL:
+        chars = _ALL - {av}
+    elif op is sre_constants.ANY:
+        chars = _ALL - {10}
+    elif op is sre_constants.IN:
+        chars = _in_set(av)
+    else:
+        return None
+    if ignore_case:
+        chars = chars | {ord(chr(code).swapcase()) for code in chars if code < 256 and ord(chr(code).swapcase()) < 256}
+    return frozenset(chars)
+
+
+def _in_set(members) -> frozenset:
+    chars = set()
+    negate = False
+    for op, av in members:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            chars.add(av if av < 256 else _OTHER)
+        elif op is sre_constants.RANGE:
+            low, high = av
+            chars.update(range(low, min(high, 255) + 1))
+            if high >= 256:
+                chars.add(_OTHER)
+        elif op is sre_constants.CATEGORY:
+            chars.update(_CATEGORIES.get(av, _ALL))
+        else:
+            chars.update(_ALL)  # Unknown member, assume anything
+    return frozenset(_ALL - chars | {_OTHER}) if negate else frozenset(chars)
+
+
+def _all_chars(items:list, ignore_case:bool) -> frozenset:
+    """Returns every character a match of items can contain."""
+    chars = set()
+    for op, av in items:
+        item_chars = _char_set(op, av, ignore_case)
+        if item_chars is not None:
+            chars |= item_chars
+        elif op is sre_constants.GROUPREF:
+            chars |= _ALL
+        elif op not in _ZERO_WIDTH:
+            for sub_items in _sub_sequences(op, av):
+                chars |= _all_chars(sub_items, ignore_case)
+            if _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+                chars |= _all_chars(list(av), ignore_case)
+            elif op is _POSSESSIVE_REPEAT:
+                chars |= _all_chars(list(av[2]), ignore_case)
+    return frozenset(chars)
+
+
+def _first_chars(items:list, ignore_case:bool) -> frozenset:
+    """Returns the characters a match of items can start with."""
+    chars = set()
+    for op, av in items:
+        item_chars = _char_set(op, av, ignore_case)
+        if item_chars is not None:
+            return frozenset(chars | item_chars)
+        if op is sre_constants.SUBPATTERN:
+            chars |= _first_chars(list(av[-1]), ignore_case)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                chars |= _first_chars(list(branch), ignore_case)
+        elif op in _REPEATS:
+            chars |= _first_chars(list(av[2]), ignore_case)
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            chars |= _first_chars(list(av), ignore_case)
+        elif op is sre_constants.GROUPREF:
+            chars |= _ALL
+        if not _can_be_empty(op, av):
+            break
+    return frozenset(chars)
+
+
+def _can_be_empty(op, av) -> bool:
+    if op in _ZERO_WIDTH or op is sre_constants.GROUPREF:
+        return True
+    if op in _REPEATS:
+        return av[0] == 0 or _sequence_can_be_empty(av[2])
+    if op is sre_constants.SUBPATTERN:
+        return _sequence_can_be_empty(av[-1])
+    if _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+        return _sequence_can_be_empty(av)
+    if op is sre_constants.BRANCH:
+        return any(_sequence_can_be_empty(branch) for branch in av[1])
+    if op is sre_constants.GROUPREF_EXISTS:
+        return any(_sequence_can_be_empty(branch) if branch else True for branch in av[1:])
+    return False
+
+
+def _sequence_can_be_empty(items) -> bool:
+    return all(_can_be_empty(op, av) for op, av in items)
+
+
+def _example(chars:frozenset) -> str:
+    """Returns a readable character of a set for the finding's message."""
+    printable = sorted(code for code in chars if code < 256 and chr(code).isprintable() and code != 32)
+    if printable:
+        return repr(chr(next((code for code in printable if chr(code).isalnum()), printable[0])))
+    return repr(chr(min(chars)))
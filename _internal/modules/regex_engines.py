@@ -0,0 +1,198 @@
+import importlib
+import re
+
+from _internal.modules.redos_check import has_exponential_backtracking
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+AUTO_ENGINE = "auto"
+# Python module of every engine: the standard library, RE2 bindings (google-re2 or pyre2) and the "regex" package
+ENGINE_MODULES = {"re": "re", "re2": "re2", "regex": "regex"}
+ENGINE_CHOICES = (AUTO_ENGINE, *ENGINE_MODULES)
+
+# Features RE2 does not support, patterns using them stay on a backtracking engine
+BACKTRACKING_FEATURES = frozenset({"backreference", "conditional", "lookaround", "atomic"})
+
+_REPEATS = tuple(
+    getattr(sre_constants, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+_FEATURE_OPS = {
+    sre_constants.GROUPREF: "backreference",
+    sre_constants.GROUPREF_EXISTS: "conditional",
+    sre_constants.ASSERT: "lookaround",
+    sre_constants.ASSERT_NOT: "lookaround",
+}
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)  # Python 3.11+
+for _op in (_ATOMIC_GROUP, getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+    if _op is not None:
+        _FEATURE_OPS[_op] = "atomic"
+
+_modules = {}
+
+
+def load_engine(name:str):
+    """Returns the module of a regex engine, None if it is not installed. Imported on first use."""
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(ENGINE_MODULES[name])
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
+
+
+def available_engines() -> list:
+    """Returns the names of the installed engines, "re" always first."""
+    return [name for name in ENGINE_MODULES if load_engine(name) is not None]
+
+
+def pattern_features(pattern) -> set:
+    """Returns the names of the features of a pattern that need a backtracking engine.
+
+    "backreference", "conditional", "lookaround" and "atomic" (atomic groups,
+    possessive repeats), none of them is supported by RE2.
+
+    Raises:
+        re.error: If the pattern is not valid for ``re``.
+    """
+    features = set()
+    _collect_features(sre_parse.parse(pattern), features)
+    return features
+
+
+def _collect_features(items, features:set) -> None:
+    for op, av in items:
+        if op in _FEATURE_OPS:
+            features.add(_FEATURE_OPS[op])
+        if op in _REPEATS:
+            _collect_features(av[2], features)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _collect_features(branch, features)
+        elif op is sre_constants.SUBPATTERN:
+            _collect_features(av[-1], features)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _collect_features(av[1], features)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            _collect_features(av[1], features)
+            if av[2]:
+                _collect_features(av[2], features)
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            _collect_features(av, features)
+
+
+def matches_alike_as_bytes(pattern) -> bool:
+    """Whether a str pattern, compiled as bytes pattern, matches the encoded text exactly like the text.
+
+    True for patterns built only from ASCII literals, ASCII character sets,
+    groups, alternatives, repeats, anchors and backreferences, in an encoding
+    whose bytes below 0x80 are always ASCII characters (e.g. UTF-8 or
+    cp1252). \\w, \\d, \\s and \\b match Unicode characters in str
+    patterns but ASCII only in bytes patterns, "." and negated sets match a
+    single byte of a multi-byte character, those patterns are not alike.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return False
+    return not parsed.state.flags & re.IGNORECASE and _ascii_only(parsed)
+
+
+def _ascii_only(items) -> bool:
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av >= 0x80:
+                return False
+        elif op is sre_constants.IN:
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL and item_av < 0x80:
+                    continue
+                if item_op is sre_constants.RANGE and item_av[1] < 0x80:
+                    continue
+                return False
+        elif op is sre_constants.AT:
+            if av not in (sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING,
+                          sre_constants.AT_END, sre_constants.AT_END_STRING):
+                return False
+        elif op in _REPEATS:
+            if not _ascii_only(av[2]):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_ascii_only(branch) for branch in av[1]):
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            if av[1] & re.IGNORECASE or not _ascii_only(av[-1]):
+                return False
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not _ascii_only(av[1]):
+                return False
+        elif op is sre_constants.GROUPREF_EXISTS:
+            if not _ascii_only(av[1]) or (av[2] and not _ascii_only(av[2])):
+                return False
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            if not _ascii_only(av):
+                return False
+        elif op is not sre_constants.GROUPREF:
+            return False  # ".", negated literals, categories
+    return True
+
+
+def select_engine(pattern, engine:str=AUTO_ENGINE) -> str:
+    """Returns the name of the engine a pattern is compiled with.
+
+    An explicit engine is returned as is. "auto" keeps the fast standard
+    ``re`` for ordinary patterns and picks RE2, if installed, for patterns
+    redos_check finds exponential backtracking in, e.g. "(a+)+", where RE2
+    guarantees linear time at a higher cost per call. Patterns that need backreferences, lookarounds or atomic groups
+    stay on ``re``, patterns only the "regex" package understands (e.g.
+    "\\p{L}") go to it if installed.
+    """
+    if engine != AUTO_ENGINE:
+        return engine
+    try:
+        features = pattern_features(pattern)
+    except re.error:
+        return "regex" if load_engine("regex") is not None else "re"
+    if features & BACKTRACKING_FEATURES:
+        return "re"
+    if load_engine("re2") is not None and has_exponential_backtracking(pattern):
+        return "re2"
+    return "re"
+
+
+def compile_pattern(pattern, engine:str=AUTO_ENGINE) -> tuple:
+    """Compiles a str or bytes pattern with the selected engine.
+
+    The compiled patterns of all engines have ``search``, ``findall`` and
+    ``groups`` like ``re.Pattern``. Note that RE2 matches \\d, \\w, \\s and
+    \\b in str patterns against ASCII only. With "auto", a pattern RE2 rejects
+    (e.g. a repeat above 1000) is compiled with ``re`` instead.
+
+    Returns:
+        A tuple of the compiled pattern and the name of the engine used.
+
+    Raises:
+        ImportError: If an explicitly requested engine is not installed.
+        ValueError: If the engine name is unknown.
+    """
+    if engine not in ENGINE_CHOICES:
+        raise ValueError(f"Unknown regex engine {engine!r}, choose one of {', '.join(ENGINE_CHOICES)}.")
+    name = select_engine(pattern, engine)
+    module = load_engine(name)
+    if module is None:
+        raise ImportError(f"The {name} regex engine is not installed, install it with 'pip install {_package(name)}'.")
+    try:
+        return module.compile(pattern), name
+    except module.error:
+        if engine != AUTO_ENGINE or name == "re":
+            raise
+    return re.compile(pattern), "re"
+
+
+def _package(name:str) -> str:
+    return {"re2": "google-re2"}.get(name, name)
@@ -0,0 +1,283 @@
+import heapq
+import json
+import math
+import os
+from collections import Counter
+
+from _internal.modules.distinct_counter import distinct_counter, distinct_counter_from_dict, merge_distinct_counters
+from _internal.modules.quantile_sketch import QuantileSketch
+
+SUMMARY_VERSION = 3
+# Entries kept in the largest and smallest file lists
+TOP_COUNT = 10
+# Distinct filenames kept per profile
+PROFILE_FILENAME_COUNT = 5
+
+
+def summary_sidecar_path(csv_path:str) -> str:
+    """Returns the path of the summary file written alongside a CSV result file."""
+    return f"{os.path.splitext(csv_path)[0]}.summary.json"
+
+
+def file_extension(filename:str) -> str:
+    """Returns the text after the last dot of a filename, "unknown" if there is none."""
+    _, dot, extension = filename.rpartition(".")
+    return extension if dot and extension else "unknown"
+
+
+def csv_file_key(csv_path:str) -> list:
+    stat = os.stat(csv_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class RunningStats:
+    """Count, sum, mean, standard deviation, min and max of a stream of numbers.
+
+    Mean and variance are updated with Welford's algorithm, two instances
+    are merged with the parallel variant of Chan et al., so statistics of
+    separate runs combine without the values.
+    """
+
+    __slots__ = ("count", "total", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value:int) -> None:
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other:"RunningStats") -> None:
+        if not other.count:
+            return
+        if not self.count:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation like pandas, NaN for less than two values."""
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "RunningStats":
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, data[name])
+        return stats
+
+
+class TopValues:
+    """Keeps the count largest or smallest file sizes of a stream in a bounded heap.
+
+    Ties keep the entry seen first, like DataFrame.nlargest and nsmallest.
+    """
+
+    def __init__(self, count:int=TOP_COUNT, largest:bool=True):
+        self.count = count
+        self.largest = largest
+        self.heap = []  # (ordering key, -sequence number, size, filename), root is the entry to drop next
+
+    def add(self, size:int, sequence:int, filename:str) -> None:
+        item = (size if self.largest else -size, -sequence, size, filename)
+        if len(self.heap) < self.count:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+    def merge(self, other:"TopValues", sequence_offset:int=0) -> None:
+        for _, negative_sequence, size, filename in other.heap:
+            self.add(size, sequence_offset - negative_sequence, filename)
+
+    def items(self) -> list:
+        """Returns (filename, size) tuples, largest or smallest first."""
+        return [(filename, size) for _, _, size, filename in sorted(self.heap, reverse=True)]
+
+    def to_list(self) -> list:
+        return [[-negative_sequence, size, filename] for _, negative_sequence, size, filename in self.heap]
+
+    def extend(self, entries:list) -> None:
+        for sequence, size, filename in entries:
+            self.add(size, sequence, filename)
+
+
+class RunSummary:
+    """Accumulates the statistics window's figures while rows are extracted.
+
+    Every row is added once, as it is written to the CSV file. The summary
+    holds overall size statistics, the largest and smallest files, entries
+    and size statistics per profile, quantile sketches of the file sizes
+    overall and per profile, the count per file type and counters of the
+    distinct filenames and job numbers, all in memory bounded by the number
+    of profiles and file types. Summaries of consecutive runs into the same
+    CSV file are merged.
+
+    The distinct filenames and job numbers are counted exactly by default,
+    which keeps every distinct value in memory. With approximate_distinct
+    they are estimated with HyperLogLog counters in fixed memory instead.
+    """
+
+    def __init__(self, approximate_distinct:bool=False):
+        self.sizes = RunningStats()
+        self.largest = TopValues(TOP_COUNT, largest=True)
+        self.smallest = TopValues(TOP_COUNT, largest=False)
+        self.size_sketch = QuantileSketch()
+        self.profiles = {}  # Profile name -> RunningStats of its file sizes
+        self.profile_sketches = {}  # Profile name -> QuantileSketch of its file sizes
+        self.profile_filenames = {}  # Profile name -> first distinct filenames
+        self.filetypes = Counter()
+        self.filename_counter = distinct_counter(approximate_distinct)
+        self.job_counter = distinct_counter(approximate_distinct)
+        self.last_job_number = None  # Consecutive rows often belong to the same job
+
+    @property
+    def total_entries(self) -> int:
+        return self.sizes.count
+
+    def add_row(self, row:list) -> None:
+        _, job_number, profile_name, filename, filesize = row
+        size = int(filesize)
+        sequence = self.sizes.count
+        self.sizes.add(size)
+        self.largest.add(size, sequence, filename)
+        self.smallest.add(size, sequence, filename)
+        self.size_sketch.add(size)
+
+        profile_stats = self.profiles.get(profile_name)
+        if profile_stats is None:
+            profile_stats = self.profiles[profile_name] = RunningStats()
+            self.profile_sketches[profile_name] = QuantileSketch()
+            self.profile_filenames[profile_name] = []
+        profile_stats.add(size)
+        self.profile_sketches[profile_name].add(size)
+        filenames = self.profile_filenames[profile_name]
+        if filename and len(filenames) < PROFILE_FILENAME_COUNT and filename not in filenames:
+            filenames.append(filename)
+
+        self.filetypes[file_extension(filename)] += 1
+        self.filename_counter.add(filename)
+        if job_number != self.last_job_number:
+            self.job_counter.add(job_number)
+            self.last_job_number = job_number
+
+    def add_rows(self, rows:list) -> None:
+        for row in rows:
+            self.add_row(row)
+
+    def merge(self, other:"RunSummary") -> None:
+        """Adds the figures of a later run, its rows come after the rows of this summary."""
+        self.largest.merge(other.largest, sequence_offset=self.sizes.count)
+        self.smallest.merge(other.smallest, sequence_offset=self.sizes.count)
+        self.sizes.merge(other.sizes)
+        self.size_sketch.merge(other.size_sketch)
+
+        for profile_name, other_stats in other.profiles.items():
+            if profile_name not in self.profiles:
+                self.profiles[profile_name] = RunningStats()
+                self.profile_sketches[profile_name] = QuantileSketch()
+                self.profile_filenames[profile_name] = []
+            self.profiles[profile_name].merge(other_stats)
+            self.profile_sketches[profile_name].merge(other.profile_sketches[profile_name])
+            filenames = self.profile_filenames[profile_name]
+            for filename in other.profile_filenames[profile_name]:
+                if len(filenames) < PROFILE_FILENAME_COUNT and filename not in filenames:
+                    filenames.append(filename)
+
+        self.filetypes.update(other.filetypes)
+        self.filename_counter = merge_distinct_counters(self.filename_counter, other.filename_counter)
+        self.job_counter = merge_distinct_counters(self.job_counter, other.job_counter)
+
+    def unique_file_count(self) -> int:
+        """Returns the number of unique filenames, estimated if distinct_count_error is set."""
+        return self.filename_counter.estimate()
+
+    def unique_job_count(self) -> int:
+        """Returns the number of unique job numbers, estimated if distinct_count_error is set."""
+        return self.job_counter.estimate()
+
+    @property
+    def distinct_count_error(self) -> float:
+        """Relative standard error of the unique filename and job number estimates, None if they are exact."""
+        return self.filename_counter.relative_error
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SUMMARY_VERSION,
+            "sizes": self.sizes.to_dict(),
+            "largest": self.largest.to_list(),
+            "smallest": self.smallest.to_list(),
+            "size_sketch": self.size_sketch.to_dict(),
+            "profiles": {name: stats.to_dict() for name, stats in self.profiles.items()},
+            "profile_sketches": {name: sketch.to_dict() for name, sketch in self.profile_sketches.items()},
+            "profile_filenames": self.profile_filenames,
+            "filetypes": dict(self.filetypes),
+            "filename_counter": self.filename_counter.to_dict(),
+            "job_counter": self.job_counter.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "RunSummary":
+        summary = cls()
+        summary.sizes = RunningStats.from_dict(data["sizes"])
+        summary.largest.extend(data["largest"])
+        summary.smallest.extend(data["smallest"])
+        summary.size_sketch = QuantileSketch.from_dict(data["size_sketch"])
+        summary.profiles = {name: RunningStats.from_dict(stats) for name, stats in data["profiles"].items()}
+        summary.profile_sketches = {
+            name: QuantileSketch.from_dict(sketch) for name, sketch in data["profile_sketches"].items()
+        }
+        summary.profile_filenames = data["profile_filenames"]
+        summary.filetypes = Counter(data["filetypes"])
+        summary.filename_counter = distinct_counter_from_dict(data["filename_counter"])
+        summary.job_counter = distinct_counter_from_dict(data["job_counter"])
+        return summary
+
+    def save(self, csv_path:str) -> None:
+        """Writes the summary next to csv_path, stamped with the CSV file's current size and mtime."""
+        data = self.to_dict()
+        data["csv_file"] = csv_file_key(csv_path)
+        summary_path = summary_sidecar_path(csv_path)
+        temp_file = f"{summary_path}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_file, summary_path)
+
+
+def load_run_summary(csv_path:str) -> RunSummary:
+    """Returns the summary written alongside a CSV file, None if there is none or
+    the CSV file has been changed since."""
+    summary_path = summary_sidecar_path(csv_path)
+    try:
+        with open(summary_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SUMMARY_VERSION or data.get("csv_file") != csv_file_key(csv_path):
+            return None
+        return RunSummary.from_dict(data)
+    except (OSError, ValueError, KeyError):
+        return None
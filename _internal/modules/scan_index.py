@@ -0,0 +1,126 @@
+import hashlib
+import json
+import lzma
+import os
+
+from _internal.modules.compressed_input import STREAM_CODECS, compression_suffix, strip_compression_suffix
+
+DEFAULT_INDEX_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configuration", "scan_index.json"
+)
+# Number of bytes at the start of a log file hashed to recognise it again
+FINGERPRINT_SIZE = 4096
+
+
+def file_fingerprint(filepath:str, length:int=FINGERPRINT_SIZE) -> str:
+    """Returns the SHA-1 of the first length bytes of a file."""
+    with open(filepath, "rb") as file:
+        return hashlib.sha1(file.read(length)).hexdigest()
+
+
+class ScanIndex:
+    """Persists how far every log file has been processed into which CSV file.
+
+    For each output CSV the index keeps path, size, mtime, a fingerprint of
+    the first bytes and the offset after the last processed line of every
+    log file. An incremental scan continues a file at its offset as long as
+    the fingerprint still matches and the file did not shrink, otherwise the
+    file is treated as new. A log compressed by rotation, e.g. a_message.log
+    to a_message.log.gz, is recognised by the fingerprint of its decompressed
+    start (see rotated_offset).
+    """
+
+    def __init__(self, index_file:str=DEFAULT_INDEX_FILE):
+        self.index_file = index_file
+        self.index = self.load_index()
+
+    def load_index(self) -> dict:
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, OSError):
+                return {}
+        return {}
+
+    def save_index(self) -> None:
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        temp_file = f"{self.index_file}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=4)
+        os.replace(temp_file, self.index_file)
+
+    def entries(self, output_csv:str) -> dict:
+        return self.index.setdefault(os.path.abspath(output_csv), {})
+
+    def reset(self, output_csv:str) -> None:
+        """Forgets all offsets of an output CSV, e.g. before it gets rewritten."""
+        self.index[os.path.abspath(output_csv)] = {}
+
+    def start_offset(self, output_csv:str, filepath:str) -> int:
+        """Returns the offset to continue a log file from, 0 if it has to be read from the start."""
+        entry = self.entries(output_csv).get(os.path.abspath(filepath))
+        if not entry:
+            return 0
+
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return 0
+        if stat.st_size < entry["offset"]:
+            return 0  # Truncated or replaced
+        if stat.st_size == entry["size"] and stat.st_mtime == entry["mtime"]:
+            return entry["offset"]  # Unchanged, skip the fingerprint read
+        if file_fingerprint(filepath, entry["fingerprint_length"]) != entry["fingerprint"]:
+            return 0  # Rotated, same name but new content
+        return entry["offset"]
+
+    def rotated_offset(self, output_csv:str, filepath:str) -> int:
+        """Returns how many decompressed bytes of a rotated, compressed log have already been processed.
+
+        The first bytes of the decompressed data are compared with the
+        fingerprints of the plain log files processed in the same folder,
+        first with the log named like the file without the suffix. If one
+        matches, the file is that log compressed and its data up to the log's
+        offset has been processed under the old name. Only .gz, .bz2 and .xz
+        files are recognised, zip archives always hold a copy.
+
+        Returns:
+            The offset in the decompressed data to continue at, 0 if the file
+            is tracked under its own name or is not a rotated log.
+        """
+        suffix = compression_suffix(filepath)
+        entries = self.entries(output_csv)
+        path = os.path.abspath(filepath)
+        if suffix not in STREAM_CODECS or entries.get(path):
+            return 0
+        folder = os.path.dirname(path)
+        candidates = [
+            (log_path, entry) for log_path, entry in entries.items()
+            if not compression_suffix(log_path) and os.path.dirname(log_path) == folder and entry["fingerprint_length"]
+        ]
+        if not candidates:
+            return 0
+        try:
+            with open(filepath, "rb") as raw, STREAM_CODECS[suffix](raw) as stream:
+                start = stream.read(FINGERPRINT_SIZE)
+        except (OSError, EOFError, lzma.LZMAError):
+            return 0
+        candidates.sort(key=lambda candidate: candidate[0] != strip_compression_suffix(path))
+        for _, entry in candidates:
+            length = entry["fingerprint_length"]
+            if len(start) >= length and hashlib.sha1(start[:length]).hexdigest() == entry["fingerprint"]:
+                return entry["offset"]
+        return 0
+
+    def update(self, output_csv:str, filepath:str, offset:int) -> None:
+        """Records that filepath has been processed up to offset."""
+        stat = os.stat(filepath)
+        fingerprint_length = min(FINGERPRINT_SIZE, offset)
+        self.entries(output_csv)[os.path.abspath(filepath)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "fingerprint": file_fingerprint(filepath, fingerprint_length),
+            "fingerprint_length": fingerprint_length,
+            "offset": offset,
+        }
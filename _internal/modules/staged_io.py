@@ -0,0 +1,101 @@
+import queue
+import threading
+
+# Items that may wait between two pipeline stages before the producing stage blocks
+DEFAULT_QUEUE_SIZE = 4
+# Seconds a blocked stage waits before checking whether it has been stopped
+STAGE_POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+class _StageFailure:
+    def __init__(self, exception:BaseException):
+        self.exception = exception
+
+
+def prefetch(iterable, queue_size:int=DEFAULT_QUEUE_SIZE):
+    """Runs an iterable in a background thread and yields its items in order.
+
+    Used as the reader stage of the extraction: while the caller parses one
+    block, the thread already reads the next ones. The bounded queue applies
+    backpressure, at most queue_size items are read ahead. Exceptions of the
+    iterable are raised in the caller. Close the generator (e.g. with
+    contextlib.closing) before closing the file the iterable reads from, the
+    thread is stopped and joined on close.
+    """
+    items = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=STAGE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as ex:
+            put(_StageFailure(ex))
+            return
+        put(_END)
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageFailure):
+                raise item.exception
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class BackgroundWriter:
+    """Writer stage that passes batches to write_batch in a background thread.
+
+    put blocks while queue_size batches are waiting, so a slow disk slows
+    down the parsing instead of filling the memory. The first exception of
+    write_batch is raised by the next put or by close, later batches are
+    dropped.
+    """
+
+    def __init__(self, write_batch, queue_size:int=DEFAULT_QUEUE_SIZE):
+        self.write_batch = write_batch
+        self.batches = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="batch-writer", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            batch = self.batches.get()
+            if batch is _END:
+                return
+            if self.error is None:
+                try:
+                    self.write_batch(batch)
+                except BaseException as ex:
+                    self.error = ex
+
+    def put(self, batch:list) -> None:
+        if self.error is not None:
+            raise self.error
+        self.batches.put(batch)
+
+    def close(self) -> None:
+        """Waits until all batches are written."""
+        self.batches.put(_END)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
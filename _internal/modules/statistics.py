@@ -0,0 +1,329 @@
+import os
+import threading
+
+import pandas as pd
+
+from _internal.modules.output_sinks import fresh_parquet_sidecar, parquet_parts
+from _internal.modules.quantile_sketch import REPORTED_QUANTILES, quantile_label
+from _internal.modules.run_summary import RunSummary
+
+# Union of the columns any statistic needs, loaded once per result file
+STATISTICS_COLUMNS = ["Filename", "Filesize in Bytes", "Profile Name", "Job Number"]
+RESULT_DTYPES = {
+    "Time": "string",
+    "Job Number": "category",
+    "Profile Name": "category",
+    "Filename": "string",
+    "Filesize in Bytes": "int64",
+}
+# Number of result files kept in memory at the same time
+MAX_CACHED_DATASETS = 2
+# Rows parsed per chunk by the streaming aggregates
+AGGREGATE_CHUNK_ROWS = 262144
+# File size quantiles in the per profile table
+PROFILE_QUANTILES = (0.5, 0.9, 0.99)
+PROFILE_SIZE_COLUMNS = [
+    "Profile Name",
+    "Avg File Size (Bytes)",
+    "Std File Size (Bytes)",
+    "Min File Size (Bytes)",
+    "Max File Size (Bytes)",
+    *[f"{quantile_label(quantile)} File Size (Bytes)" for quantile in PROFILE_QUANTILES],
+    "Count",
+    "Filenames",
+]
+
+_dataset_cache = {}  # abspath -> (file key, DataFrame)
+_dataset_cache_lock = threading.Lock()
+
+
+def read_results(csv_path:str, usecols:list) -> pd.DataFrame:
+    """Reads columns of a result CSV file with explicit dtypes.
+
+    If the extraction also wrote an up to date Parquet sidecar, the columns
+    are read from it instead, already typed and without text parsing.
+    """
+    parquet_path = fresh_parquet_sidecar(csv_path)
+    if parquet_path:
+        try:
+            return pd.read_parquet(parquet_path, columns=usecols)
+        except ImportError:
+            pass  # No Parquet engine installed, fall back to the CSV
+    dtype = {column: RESULT_DTYPES[column] for column in usecols if column in RESULT_DTYPES}
+    # The default C engine, the fallback must work without pyarrow
+    return pd.read_csv(csv_path, usecols=usecols, dtype=dtype)
+
+
+def load_results(csv_path:str, usecols:list=None) -> pd.DataFrame:
+    """Returns the statistics columns of a result file, parsed at most once.
+
+    The dataset is cached per path and reloaded only when the file's mtime or
+    size changes. It always holds at least STATISTICS_COLUMNS, so the summary,
+    the other statistic tabs, the file size summary and the Excel export all
+    share one parse. The returned DataFrame is shared, callers must not modify it.
+
+    Args:
+        csv_path: Path of the CSV result file.
+        usecols: Columns needed by the caller, added to the cached columns if missing.
+    """
+    usecols = usecols or STATISTICS_COLUMNS
+    path = os.path.abspath(csv_path)
+    stat = os.stat(path)
+    file_key = (stat.st_mtime_ns, stat.st_size)
+
+    with _dataset_cache_lock:
+        cached = _dataset_cache.get(path)
+        if cached and cached[0] == file_key and all(column in cached[1].columns for column in usecols):
+            return cached[1]
+
+        columns = list(STATISTICS_COLUMNS)
+        if cached and cached[0] == file_key:
+            columns += [column for column in cached[1].columns if column not in columns]
+        columns += [column for column in usecols if column not in columns]
+        df = read_results(path, columns)
+
+        _dataset_cache.pop(path, None)
+        while len(_dataset_cache) >= MAX_CACHED_DATASETS:
+            _dataset_cache.pop(next(iter(_dataset_cache)))
+        _dataset_cache[path] = (file_key, df)
+        return df
+
+
+def clear_results_cache() -> None:
+    with _dataset_cache_lock:
+        _dataset_cache.clear()
+
+
+def iter_column_chunks(csv_path:str, column:str, chunk_rows:int=AGGREGATE_CHUNK_ROWS, on_progress=None):
+    """Yields one column of a result file as a series per chunk of rows.
+
+    The column is read from the Parquet sidecar if it is up to date and
+    pyarrow is installed, otherwise from the CSV file. Only one chunk is
+    held in memory at a time.
+
+    Args:
+        csv_path: Path of the CSV result file.
+        column: Name of the column to read.
+        chunk_rows: Number of rows per chunk.
+        on_progress: Callable receiving the progress in percent after every chunk.
+    """
+    parquet_path = fresh_parquet_sidecar(csv_path)
+    if parquet_path:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            parquet_path = None  # No Parquet engine installed, fall back to the CSV
+
+    if parquet_path:
+        parquet_files = [pq.ParquetFile(part) for part in parquet_parts(parquet_path)]
+        total_rows = sum(parquet_file.metadata.num_rows for parquet_file in parquet_files) or 1
+        rows_done = 0
+        for parquet_file in parquet_files:
+            for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=[column]):
+                rows_done += batch.num_rows
+                yield batch.column(0).to_pandas()
+                if on_progress:
+                    on_progress(rows_done * 100 // total_rows)
+        return
+
+    file_size = os.path.getsize(csv_path) or 1
+    dtype = {column: RESULT_DTYPES[column]} if column in RESULT_DTYPES else None
+    with open(csv_path, "rb") as file:
+        for chunk in pd.read_csv(file, usecols=[column], dtype=dtype, chunksize=chunk_rows):
+            yield chunk[column]
+            if on_progress:
+                on_progress(min(100, file.tell() * 100 // file_size))
+
+
+def filesize_totals(csv_path:str, is_cancelled=None, on_progress=None) -> dict:
+    """Returns sum, count, min and max of the file sizes of a result file.
+
+    The totals are accumulated chunk by chunk from the file size column
+    only, so memory use does not grow with the size of the result file.
+
+    Returns:
+        A dict with the keys sum, count, min and max, min and max are None
+        for a file without rows. None if the calculation was cancelled.
+    """
+    totals = {"sum": 0, "count": 0, "min": None, "max": None}
+    for sizes in iter_column_chunks(csv_path, "Filesize in Bytes", on_progress=on_progress):
+        if is_cancelled and is_cancelled():
+            return None
+        sizes = sizes.dropna()
+        if sizes.empty:
+            continue
+        chunk_min = int(sizes.min())
+        chunk_max = int(sizes.max())
+        totals["sum"] += int(sizes.sum())
+        totals["count"] += len(sizes)
+        totals["min"] = chunk_min if totals["min"] is None else min(totals["min"], chunk_min)
+        totals["max"] = chunk_max if totals["max"] is None else max(totals["max"], chunk_max)
+    return totals
+
+
+def summary_statistics(df:pd.DataFrame) -> dict:
+    """Returns the overall file size statistics shown in the summary tab.
+
+    Median, quantiles and distinct counts are exact, quantile_error and
+    distinct_error are None.
+    """
+    size_stats = df["Filesize in Bytes"].agg(["sum", "mean", "max", "min", "median", "std"])
+    size_quantiles = df["Filesize in Bytes"].quantile(list(REPORTED_QUANTILES))
+    return {
+        "total_files": int(df["Filename"].nunique()),
+        "unique_jobs": int(df["Job Number"].nunique()),
+        "unique_profiles": int(df["Profile Name"].nunique()),
+        "distinct_error": None,
+        "total_entries": len(df),
+        "total_size": size_stats["sum"],
+        "avg_size": size_stats["mean"],
+        "max_size": size_stats["max"],
+        "min_size": size_stats["min"],
+        "median_size": size_stats["median"],
+        "std_dev_size": size_stats["std"],
+        "size_quantiles": {quantile_label(quantile): value for quantile, value in size_quantiles.items()},
+        "quantile_error": None,
+        "files_by_profile": df["Profile Name"].value_counts(),
+        "top_10_largest": df.nlargest(10, "Filesize in Bytes")[["Filename", "Filesize in Bytes"]],
+        "top_10_smallest": df.nsmallest(10, "Filesize in Bytes")[["Filename", "Filesize in Bytes"]],
+    }
+
+
+def summary_dataframe(summary:dict) -> pd.DataFrame:
+    """Returns the scalar values of summary_statistics as a two column table for exports."""
+    labels = {
+        "total_files": "Unique Files",
+        "unique_jobs": "Unique Job Numbers",
+        "unique_profiles": "Profiles",
+        "total_entries": "Log Entries",
+        "total_size": "Total Size (Bytes)",
+        "avg_size": "Avg File Size (Bytes)",
+        "max_size": "Max File Size (Bytes)",
+        "min_size": "Min File Size (Bytes)",
+        "median_size": "Median File Size (Bytes)",
+        "std_dev_size": "Std File Size (Bytes)",
+    }
+    statistics = [labels[key] for key in labels]
+    values = [summary[key] for key in labels]
+    for label, value in summary["size_quantiles"].items():
+        statistics.append(f"{label} File Size (Bytes)")
+        values.append(value)
+    if summary["quantile_error"]:
+        statistics.append("Quantile Relative Error")
+        values.append(summary["quantile_error"])
+    if summary["distinct_error"]:
+        statistics.append("Unique Count Relative Standard Error")
+        values.append(summary["distinct_error"])
+    return pd.DataFrame({"Statistic": statistics, "Value": values})
+
+
+def first_filenames_per_profile(df:pd.DataFrame, count:int=5) -> pd.Series:
+    """Returns the first count distinct, non empty filenames of every profile joined by ", ".
+
+    Deduplication and the per profile limit run as vectorised pandas
+    operations, only the at most count names per profile are joined in Python.
+    """
+    filenames = df[["Profile Name", "Filename"]].dropna()
+    filenames = filenames[filenames["Filename"] != ""].drop_duplicates()
+    first_filenames = filenames.groupby("Profile Name", observed=True, sort=False).head(count)
+    return first_filenames.groupby("Profile Name", observed=True)["Filename"].agg(", ".join)
+
+
+def round_profile_size_statistics(profile_size_summary:pd.DataFrame) -> pd.DataFrame:
+    rounded_columns = ["Avg File Size (Bytes)", "Std File Size (Bytes)"]
+    rounded_columns += [f"{quantile_label(quantile)} File Size (Bytes)" for quantile in PROFILE_QUANTILES]
+    profile_size_summary[rounded_columns] = profile_size_summary[rounded_columns].round(2)
+    return profile_size_summary
+
+
+def profile_size_statistics(df:pd.DataFrame) -> pd.DataFrame:
+    """Returns file size statistics, quantiles and the first five filenames per profile."""
+    sizes_by_profile = df.groupby("Profile Name", observed=True)["Filesize in Bytes"]
+    profile_size_summary = sizes_by_profile.agg(["mean", "std", "min", "max"])
+    profile_quantiles = sizes_by_profile.quantile(list(PROFILE_QUANTILES)).unstack()
+    for quantile in PROFILE_QUANTILES:
+        profile_size_summary[quantile_label(quantile)] = profile_quantiles[quantile]
+    profile_size_summary["count"] = sizes_by_profile.count()
+    profile_size_summary["Filenames"] = (
+        first_filenames_per_profile(df).reindex(profile_size_summary.index).fillna("None")
+    )
+    profile_size_summary = profile_size_summary.reset_index()
+    profile_size_summary.columns = PROFILE_SIZE_COLUMNS
+    profile_size_summary = round_profile_size_statistics(profile_size_summary)
+    return profile_size_summary
+
+
+def filetype_statistics(df:pd.DataFrame, top:int=20) -> pd.DataFrame:
+    """Returns the most common file extensions and their file count."""
+    filetypes = df["Filename"].str.extract(r'\.([^.]+)$')[0].fillna("unknown")
+    filetypes_df = filetypes.value_counts().head(top).reset_index()
+    filetypes_df.columns = ["Filetype", "File Count"]
+    return filetypes_df
+
+
+def statistics_from_run_summary(run_summary:RunSummary, top:int=20) -> dict:
+    """Returns the statistics of a summary accumulated during extraction.
+
+    The results have the shapes of summary_statistics, profile_size_statistics
+    and filetype_statistics and are keyed "summary", "profile_size" and
+    "filetype". Median and quantiles are estimated from the summary's quantile
+    sketches, quantile_error is their relative error. Unique filenames and job
+    numbers are exact unless the summary was accumulated with
+    approximate_distinct, distinct_error is the relative standard error of
+    their HyperLogLog estimates then and None otherwise. The number of
+    profiles is exact.
+    """
+    sizes = run_summary.sizes
+    empty = sizes.count == 0
+    files_by_profile = pd.Series(
+        {name: stats.count for name, stats in run_summary.profiles.items()}, dtype="int64", name="count"
+    ).sort_values(ascending=False, kind="stable")
+    files_by_profile.index.name = "Profile Name"
+    summary = {
+        "total_files": run_summary.unique_file_count(),
+        "unique_jobs": run_summary.unique_job_count(),
+        "unique_profiles": len(run_summary.profiles),
+        "distinct_error": run_summary.distinct_count_error,
+        "total_entries": sizes.count,
+        "total_size": sizes.total,
+        "avg_size": float("nan") if empty else sizes.total / sizes.count,
+        "max_size": float("nan") if empty else sizes.maximum,
+        "min_size": float("nan") if empty else sizes.minimum,
+        "median_size": float("nan") if empty else run_summary.size_sketch.quantile(0.5),
+        "std_dev_size": sizes.std,
+        "size_quantiles": {
+            label: float("nan") if empty else value for label, value in run_summary.size_sketch.quantiles().items()
+        },
+        "quantile_error": run_summary.size_sketch.relative_accuracy,
+        "files_by_profile": files_by_profile,
+        "top_10_largest": pd.DataFrame(run_summary.largest.items(), columns=["Filename", "Filesize in Bytes"]),
+        "top_10_smallest": pd.DataFrame(run_summary.smallest.items(), columns=["Filename", "Filesize in Bytes"]),
+    }
+
+    profile_size_summary = pd.DataFrame(
+        [
+            [
+                name,
+                stats.total / stats.count,
+                stats.std,
+                stats.minimum,
+                stats.maximum,
+                *[run_summary.profile_sketches[name].quantile(quantile) for quantile in PROFILE_QUANTILES],
+                stats.count,
+                ", ".join(run_summary.profile_filenames.get(name, [])) or "None",
+            ]
+            for name, stats in sorted(run_summary.profiles.items())
+        ],
+        columns=PROFILE_SIZE_COLUMNS,
+    )
+    profile_size_summary = round_profile_size_statistics(profile_size_summary)
+
+    filetypes_df = pd.DataFrame(run_summary.filetypes.most_common(top), columns=["Filetype", "File Count"])
+    return {"summary": summary, "profile_size": profile_size_summary, "filetype": filetypes_df}
+
+
+def export_statistics_to_excel(dataframes:dict, file_path:str) -> None:
+    """Writes every dataframe of a {sheet name: dataframe} dict to its own Excel sheet."""
+    with pd.ExcelWriter(file_path, engine="xlsxwriter") as writer:
+        for sheet_name, df_export in dataframes.items():
+            df_export.to_excel(writer, sheet_name=sheet_name, index=False)
@@ -0,0 +1,46 @@
+"""Compares the line throughput of the legacy per-field re.search extraction
+with the compiled LogLineExtractor on a synthetic Lobster message log.
+
+Usage:
+    python benchmarks/bench_line_extractor.py [--lines 1000000] [--match-ratio 0.05]
+"""
+import argparse
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from _internal.modules.log_extractor import LogLineExtractor, extract_info_from_line_legacy
+from synthetic_log import generate_log_lines
+
+
+def time_extraction(name:str, extract, lines:list) -> list:
+    start_time = time.perf_counter()
+    rows = [row for row in map(extract, lines) if row is not None]
+    duration = time.perf_counter() - start_time
+    print(f"{name:<12} {duration:8.3f} s  {len(lines) / duration:14,.0f} lines/sec  {len(rows):,} matches")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--match-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    lines = list(generate_log_lines(args.lines, match_ratio=args.match_ratio))
+    print(f"Synthetic log: {len(lines):,} lines, match ratio {args.match_ratio}")
+
+    legacy_rows = time_extraction("legacy", extract_info_from_line_legacy, lines)
+    compiled_rows = time_extraction("compiled", LogLineExtractor().extract, lines)
+
+    if legacy_rows != compiled_rows:
+        print("ERROR: compiled extractor output differs from legacy output")
+        sys.exit(1)
+    print("Output identical row for row.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Runs timed scenarios of the log searcher on synthetic Lobster message logs
+and writes the results as JSON, so throughput and peak memory can be
+compared between versions.
+
+Every scenario runs in a fresh process, the reported peak memory is the peak
+resident set size of that process alone. Scenarios:
+
+    extract             LogExtractionJob with one process
+    extract_parallel    LogExtractionJob with --workers processes
+    search              RegExSearcher search (RecordMatcher.match_file) into a CSV
+    statistics          Statistics window figures computed with pandas from the CSV
+    statistics_summary  The same figures from the summary written during extraction
+    filesize_totals     Filesize summary of the main window
+    excel_export        CSV to Excel export
+
+Usage:
+    python benchmarks/run_benchmarks.py [--size-mb 100] [--files 4] [--match-ratio 0.05]
+        [--profiles 50] [--filenames N] [--scenarios extract search ...] [--repeat 3]
+        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import datetime
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from _internal.modules.resource_usage import peak_rss_bytes
+from synthetic_log import write_synthetic_logs
+
+RESULTS_VERSION = 1
+# Patterns of a typical RegExSearcher search over the message logs
+SEARCH_PATTERNS = [r"Job: (\d+)", r"\[([^\]]+)\]", r"file '([^']+)'", r"length=(\d+)"]
+SEARCH_HEADERS = ["Job", "Profile", "Filename", "Size"]
+
+
+# ====== Scenarios ====== #
+# A scenario gets the paths of the benchmark and returns the bytes it read and the items it produced
+
+def run_extract(paths:dict, workers:int=1) -> dict:
+    from _internal.modules.log_pipeline import LogExtractionJob
+
+    output_csv = paths["results_csv"] if workers == 1 else os.path.join(paths["work_dir"], "results_parallel.csv")
+    matches = LogExtractionJob(paths["data_dir"], output_csv, workers=workers).run(paths["log_files"])
+    return {"input_bytes": paths["log_bytes"], "items": matches}
+
+
+def run_extract_parallel(paths:dict) -> dict:
+    return run_extract(paths, workers=paths["workers"])
+
+
+def run_search(paths:dict) -> dict:
+    from _internal.modules.record_matcher import RecordMatcher, write_rows_to_csv
+
+    matcher = RecordMatcher(SEARCH_PATTERNS)
+    total_rows = 0
+    for index, log_file in enumerate(paths["log_files"]):
+        output_csv = os.path.join(paths["work_dir"], f"regex_matches_{index}.csv")
+        total_rows += write_rows_to_csv(matcher.match_file(log_file), SEARCH_HEADERS, output_csv)
+    return {"input_bytes": paths["log_bytes"], "items": total_rows}
+
+
+def run_statistics(paths:dict) -> dict:
+    from _internal.modules.statistics import (
+        filetype_statistics, load_results, profile_size_statistics, summary_statistics,
+    )
+
+    df = load_results(paths["results_csv"])
+    summary_statistics(df)
+    profile_size_statistics(df)
+    filetype_statistics(df)
+    return {"input_bytes": os.path.getsize(paths["results_csv"]), "items": len(df)}
+
+
+def run_statistics_summary(paths:dict) -> dict:
+    from _internal.modules.run_summary import load_run_summary
+    from _internal.modules.statistics import statistics_from_run_summary
+
+    run_summary = load_run_summary(paths["results_csv"])
+    if run_summary is None:
+        raise RuntimeError("The extraction did not write a summary sidecar.")
+    statistics_from_run_summary(run_summary)
+    return {"input_bytes": os.path.getsize(paths["results_csv"]), "items": run_summary.sizes.count}
+
+
+def run_filesize_totals(paths:dict) -> dict:
+    from _internal.modules.statistics import filesize_totals
+
+    totals = filesize_totals(paths["results_csv"])
+    return {"input_bytes": os.path.getsize(paths["results_csv"]), "items": totals["count"]}
+
+
+def run_excel_export(paths:dict) -> dict:
+    from _internal.modules.excel_export import stream_csv_to_excel
+
+    excel_path = os.path.join(paths["work_dir"], "results.xlsx")
+    total_rows, _, _ = stream_csv_to_excel(paths["results_csv"], excel_path)
+    return {"input_bytes": os.path.getsize(paths["results_csv"]), "items": total_rows}
+
+
+SCENARIOS = {
+    "extract": run_extract,
+    "extract_parallel": run_extract_parallel,
+    "search": run_search,
+    "statistics": run_statistics,
+    "statistics_summary": run_statistics_summary,
+    "filesize_totals": run_filesize_totals,
+    "excel_export": run_excel_export,
+}
+# Scenarios that read the CSV written by the "extract" scenario
+NEEDS_RESULTS = ("statistics", "statistics_summary", "filesize_totals", "excel_export")
+
+
+# ====== Runner ====== #
+
+def scenario_process(name:str, paths:dict, results) -> None:
+    try:
+        start_time = time.perf_counter()
+        result = SCENARIOS[name](paths)
+        result["seconds"] = time.perf_counter() - start_time
+        result["peak_rss_bytes"] = peak_rss_bytes()
+        results.put(result)
+    except Exception as ex:
+        results.put({"error": f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}"})
+
+
+def run_in_fresh_process(name:str, paths:dict) -> dict:
+    """Runs a scenario in a new interpreter, so its peak memory is not mixed with earlier runs."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=scenario_process, args=(name, paths, results))
+    process.start()
+    result = results.get()
+    process.join()
+    if "error" in result:
+        raise RuntimeError(f"Scenario {name} failed: {result['error']}")
+    return result
+
+
+def summarize_runs(name:str, runs:list) -> dict:
+    seconds = [run["seconds"] for run in runs]
+    best = min(seconds)
+    peaks = [run["peak_rss_bytes"] for run in runs if run["peak_rss_bytes"] is not None]
+    input_bytes = runs[0]["input_bytes"]
+    items = runs[0]["items"]
+    return {
+        "name": name,
+        "seconds": best,
+        "median_seconds": statistics.median(seconds),
+        "runs": seconds,
+        "input_bytes": input_bytes,
+        "items": items,
+        "throughput_mb_per_s": input_bytes / best / 1024 ** 2 if best else None,
+        "items_per_s": items / best if best else None,
+        "peak_rss_bytes": max(peaks) if peaks else None,
+    }
+
+
+def git_commit() -> str:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_data(args, data_dir:str) -> list:
+    log_files = sorted(glob.glob(os.path.join(data_dir, "*_message.log")))
+    if log_files:
+        print(f"Reusing {len(log_files)} log files in {data_dir}")
+        return log_files
+
+    print(f"Generating {args.files} synthetic log files of {args.size_mb} MB in total in {data_dir}...")
+    return write_synthetic_logs(
+        data_dir,
+        args.files,
+        args.size_mb * 1024 * 1024,
+        match_ratio=args.match_ratio,
+        profile_count=args.profiles,
+        filename_count=args.filenames,
+        seed=args.seed,
+    )
+
+
+def print_comparison(results:dict, baseline_path:str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline_results = json.load(baseline_file)
+    baseline = {scenario["name"]: scenario for scenario in baseline_results["scenarios"]}
+
+    print(f"\nCompared to {baseline_path} (commit {baseline_results.get('commit') or 'unknown'}):")
+    for scenario in results["scenarios"]:
+        previous = baseline.get(scenario["name"])
+        if previous is None:
+            continue
+        time_change = (scenario["seconds"] / previous["seconds"] - 1) * 100
+        line = f"{scenario['name']:<20} time {time_change:+7.1f}%"
+        if scenario["peak_rss_bytes"] and previous.get("peak_rss_bytes"):
+            memory_change = (scenario["peak_rss_bytes"] / previous["peak_rss_bytes"] - 1) * 100
+            line += f"  peak memory {memory_change:+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=100, help="Total size of the generated logs")
+    parser.add_argument("--files", type=int, default=4, help="Number of generated log files")
+    parser.add_argument("--match-ratio", type=float, default=0.05, help="Share of lines with a processed file")
+    parser.add_argument("--profiles", type=int, default=50, help="Number of distinct profile names")
+    parser.add_argument("--filenames", type=int, default=None, help="Number of distinct filenames, default all unique")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes of the extract_parallel scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario, the fastest run is reported")
+    parser.add_argument("--data-dir", help="Folder of the logs, existing *_message.log files are reused")
+    parser.add_argument("--output", help="Path of the JSON results, printed if not given")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="log_searcher_benchmark_")
+    try:
+        data_dir = args.data_dir or os.path.join(work_dir, "logs")
+        log_files = prepare_data(args, data_dir)
+        paths = {
+            "data_dir": data_dir,
+            "log_files": log_files,
+            "log_bytes": sum(os.path.getsize(log_file) for log_file in log_files),
+            "results_csv": os.path.join(work_dir, "results.csv"),
+            "work_dir": work_dir,
+            "workers": args.workers,
+        }
+
+        selected = [name for name in SCENARIOS if name in args.scenarios]
+        if "extract" not in selected and any(name in NEEDS_RESULTS for name in selected):
+            print("Extracting the results CSV for the selected scenarios...")
+            run_in_fresh_process("extract", paths)
+
+        scenarios = []
+        for name in selected:
+            runs = [run_in_fresh_process(name, paths) for _ in range(args.repeat)]
+            scenario = summarize_runs(name, runs)
+            scenarios.append(scenario)
+            peak = f"{scenario['peak_rss_bytes'] / 1024 ** 2:8.1f} MB" if scenario["peak_rss_bytes"] else "     n/a"
+            print(
+                f"{name:<20} {scenario['seconds']:8.3f} s  {scenario['throughput_mb_per_s']:8.1f} MB/s  "
+                f"{scenario['items']:>10,} items  peak {peak}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": {
+            "size_mb": args.size_mb,
+            "files": args.files,
+            "match_ratio": args.match_ratio,
+            "profiles": args.profiles,
+            "filenames": args.filenames,
+            "seed": args.seed,
+            "workers": args.workers,
+            "repeat": args.repeat,
+            "data_dir": args.data_dir,
+        },
+        "dataset": {"files": len(log_files), "bytes": paths["log_bytes"]},
+        "scenarios": scenarios,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
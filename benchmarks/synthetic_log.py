@@ -0,0 +1,87 @@
+import itertools
+import os
+import random
+
+# Line templates of a Lobster "_message.log". Only the "Start processing" line
+# carries all five fields the log searcher extracts.
+MATCH_LINE = "{time} Job: {job} [{profile}] INFO Start processing data of file '{filename}' (length={size}, encoding=UTF-8)\n"
+NOISE_LINES = (
+    "{time} Job: {job} [{profile}] INFO Parent job ID is {parent}\n",
+    "{time} Job: {job} [{profile}] DEBUG Phase 2 started, mapping {records} records\n",
+    "{time} Job: {job} [{profile}] INFO Response route 'SFTP' finished in {millis} ms\n",
+    "{time} Job: GENERAL [SYSTEM] INFO Heartbeat, free memory {records} MB\n",
+    "{time} Job: {job} [{profile}] WARN Retrying connection to partner host (attempt {attempt})\n",
+)
+FILE_EXTENSIONS = ("xml", "csv", "edi", "json", "txt", "pdf")
+
+
+def generate_log_lines(line_count:int=None, match_ratio:float=0.05, profile_count:int=50,
+                       filename_count:int=None, seed:int=42):
+    """Yields synthetic Lobster message log lines.
+
+    Args:
+        line_count: Number of lines to generate, None for an endless stream.
+        match_ratio: Share of lines that contain all extracted fields.
+        profile_count: Number of distinct profile names.
+        filename_count: Number of distinct processed filenames, None for (almost) all unique.
+        seed: Seed for the random generator, runs with the same seed are identical.
+    """
+    rng = random.Random(seed)
+    profiles = [f"PROFILE_{index:04d}" for index in range(profile_count)]
+    filename_range = filename_count - 1 if filename_count else 10**8
+    indexes = range(line_count) if line_count is not None else itertools.count()
+    for index in indexes:
+        seconds = index % 86400
+        values = {
+            "time": f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}",
+            "job": rng.randint(100000, 9999999),
+            "profile": rng.choice(profiles),
+            "parent": rng.randint(100000, 9999999),
+            "records": rng.randint(1, 50000),
+            "millis": rng.randint(1, 5000),
+            "attempt": rng.randint(1, 5),
+        }
+        if rng.random() < match_ratio:
+            file_number = rng.randint(0, filename_range)
+            values["filename"] = f"FILE_{file_number:08d}.{FILE_EXTENSIONS[file_number % len(FILE_EXTENSIONS)]}"
+            values["size"] = int(rng.lognormvariate(9, 2))
+            yield MATCH_LINE.format(**values)
+        else:
+            yield rng.choice(NOISE_LINES).format(**values)
+
+
+def write_synthetic_log(filepath:str, line_count:int=None, size_bytes:int=None, **kwargs) -> str:
+    """Writes a synthetic message log to filepath and returns the path.
+
+    Either line_count lines are written, or lines until the file reaches
+    size_bytes. The remaining keyword arguments are passed to generate_log_lines.
+    """
+    if (line_count is None) == (size_bytes is None):
+        raise ValueError("Pass either line_count or size_bytes.")
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    with open(filepath, "w", encoding="utf-8", newline="") as log_file:
+        if size_bytes is None:
+            log_file.writelines(generate_log_lines(line_count, **kwargs))
+            return filepath
+        written = 0
+        for line in generate_log_lines(**kwargs):
+            log_file.write(line)
+            written += len(line)  # The lines are ASCII, one byte per character
+            if written >= size_bytes:
+                break
+    return filepath
+
+
+def write_synthetic_logs(directory:str, file_count:int, size_bytes:int, seed:int=42, **kwargs) -> list:
+    """Writes file_count message logs of size_bytes in total to directory.
+
+    The files are named like the logs of a Lobster server ("<n>_message.log")
+    and get different seeds, so they do not repeat each other. Returns the paths.
+    """
+    paths = []
+    for index in range(file_count):
+        filepath = os.path.join(directory, f"{index + 1:03d}_message.log")
+        paths.append(
+            write_synthetic_log(filepath, size_bytes=size_bytes // file_count, seed=seed + index, **kwargs)
+        )
+    return paths